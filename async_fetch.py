@@ -0,0 +1,115 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from urllib.parse import urlparse
+
+import aiohttp
+
+from http_cache import get_cache, ttl_for
+from http_client import DEFAULT_HEADERS, DEFAULT_TIMEOUT, RATE_LIMIT_RETRIES
+from rate_limit import get_limiter, THROTTLED_STATUSES
+
+# Total requests in flight across all hosts, and per individual host.
+DEFAULT_CONCURRENCY = 32
+DEFAULT_PER_HOST = 8
+
+class AsyncFetcher:
+    """
+    A shared aiohttp session that caps requests in flight globally and per host.
+    Sends the same default headers and timeout as http_client and, unless cache is
+    False, goes through the shared on-disk response cache. Use it as an async context manager so the connection pool is closed afterwards.
+    """
+
+    def __init__(self, concurrency=DEFAULT_CONCURRENCY, per_host=DEFAULT_PER_HOST,
+                 timeout=DEFAULT_TIMEOUT, headers=None, cache=True):
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.timeout = timeout
+        self.headers = dict(DEFAULT_HEADERS, **(headers or {}))
+        self.cache = get_cache() if cache else None
+        self.session = None
+        self._global_slots = None
+        self._host_slots = {}
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=self.per_host,
+                                        keepalive_timeout=60)
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            headers=self.headers,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+        )
+        self._global_slots = asyncio.Semaphore(self.concurrency)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.session.close()
+
+    def _host_slot(self, url):
+        host = urlparse(url).netloc
+        if host not in self._host_slots:
+            self._host_slots[host] = asyncio.Semaphore(self.per_host)
+        return self._host_slots[host]
+
+    async def fetch_text(self, url):
+        """
+        GET a URL and return its decoded body, raising on HTTP errors.
+        """
+        cached = self.cache.lookup(url) if self.cache else None
+        if cached and (self.cache.offline or cached.is_fresh(ttl_for(url))):
+            self.cache.record_hit()
+            return cached.text
+        headers = cached.conditional_headers() if cached else None
+
+        for attempt in range(RATE_LIMIT_RETRIES + 1):
+            async with self._request(url, headers) as response:
+                if response.status in THROTTLED_STATUSES and attempt < RATE_LIMIT_RETRIES:
+                    print(f"Throttled on {url} (HTTP {response.status}), retrying after the pause")
+                    continue
+                if cached and response.status == 304:
+                    self.cache.touch(url)
+                    return cached.text
+                response.raise_for_status()
+                body = await response.read()
+                encoding = response.get_encoding()
+                break
+
+        if self.cache:
+            self.cache.record_miss()
+            if response.status == 200:
+                self.cache.store(url, response.status, body, encoding=encoding,
+                                 etag=response.headers.get("ETag"),
+                                 last_modified=response.headers.get("Last-Modified"))
+        return body.decode(encoding, errors="replace")
+
+    @asynccontextmanager
+    async def _request(self, url, headers=None):
+        # One GET holding the rate limiter, global and per-host slots until the block
+        # exits. The limiter is waited on first so a paused domain holds no global slot.
+        limiter = get_limiter(url)
+        await limiter.acquire_async()
+        status, retry_after = None, None
+        try:
+            async with self._global_slots, self._host_slot(url):
+                started = time.monotonic()
+                async with self.session.get(url, headers=headers) as response:
+                    status, retry_after = response.status, response.headers.get("Retry-After")
+                    yield response
+        finally:
+            limiter.release(status, time.monotonic() - started if status else 0, retry_after)
+
+    @asynccontextmanager
+    async def stream(self, url, headers=None):
+        """
+        GET a URL without reading the body, holding its concurrency slots until the
+        block exits. Yields the aiohttp response; raises on HTTP errors. Bypasses the
+        cache. headers are sent in addition to the session's.
+        """
+        for attempt in range(RATE_LIMIT_RETRIES + 1):
+            async with self._request(url, headers) as response:
+                if response.status in THROTTLED_STATUSES and attempt < RATE_LIMIT_RETRIES:
+                    print(f"Throttled on {url} (HTTP {response.status}), retrying after the pause")
+                    continue
+                response.raise_for_status()
+                yield response
+                return
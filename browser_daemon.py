@@ -0,0 +1,258 @@
+import importlib
+import json
+import os
+import queue
+import sys
+import threading
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import undetected_chromedriver as uc
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+
+import lean_browser
+from browser_pool import DEFAULT_POOL_SIZE
+from browser_waits import wait_until_ready
+from session_store import ensure_session, SITES
+
+# Control port of the daemon for each site; Chrome's own debugging port is picked by
+# undetected_chromedriver and handed out with every lease.
+DAEMON_PORTS = {"yourstory": 9231, "inc42": 9232}
+# Chrome profiles kept between daemon runs, so logins and caches stay warm.
+PROFILE_DIR = "profiles"
+# Pages a tab may load before it is closed and replaced, to cap renderer memory.
+RECYCLE_AFTER = 200
+# Module providing login() for each site.
+SITE_MODULES = {"yourstory": "yourStory", "inc42": "inc42"}
+
+class BrowserDaemon:
+    """
+    One long-lived Chrome per site with a warm profile and a pool of tabs already on
+    the home page. Scraper processes lease a tab over a small HTTP API, attach to the
+    browser with chromedriver's debuggerAddress, and release the tab when done.
+    """
+
+    def __init__(self, site, tabs=DEFAULT_POOL_SIZE, recycle_after=RECYCLE_AFTER,
+                 headless=True, lean=True):
+        self.site = site
+        self.home_url = SITES[site]["home_url"]
+        self.tabs = tabs
+        self.recycle_after = recycle_after
+        self.headless = headless
+        self.lean = lean
+        self.driver = None
+        self.lock = threading.Lock()
+        self.ready = queue.Queue()
+        self.leased = set()
+        # Pages loaded per tab, reported by clients on release.
+        self.page_counts = {}
+        self.recycled = 0
+
+    def start(self):
+        """
+        Launch Chrome, load the stored login into it, and open the tab pool.
+        """
+        # Logging in and loading the login into a browser work as in the scraper itself.
+        scraper = importlib.import_module(SITE_MODULES[self.site])
+        cookies = ensure_session(self.site, scraper.login)
+
+        options = uc.ChromeOptions()
+        options.add_argument("--no-sandbox")
+        options.add_argument("--disable-dev-shm-usage")
+        if self.lean:
+            lean_browser.configure_options(options)
+        self.driver = uc.Chrome(options=options, headless=self.headless,
+                                user_data_dir=os.path.abspath(os.path.join(PROFILE_DIR, self.site)))
+        self.driver.get(self.home_url)
+        wait_until_ready(self.driver, "homepage load")
+        scraper.add_login_cookies(self.driver, cookies)
+        for _ in range(self.tabs):
+            self.ready.put(self._open_tab())
+        print(f"Browser daemon for {self.site}: Chrome at {self.debugger_address}, "
+              f"{self.tabs} tabs ready")
+
+    @property
+    def debugger_address(self):
+        return self.driver.options.debugger_address
+
+    def _open_tab(self):
+        with self.lock:
+            return self.driver.execute_cdp_cmd("Target.createTarget", {"url": self.home_url})["targetId"]
+
+    def _close_tab(self, tab):
+        with self.lock:
+            try:
+                self.driver.execute_cdp_cmd("Target.closeTarget", {"targetId": tab})
+            except Exception as e:
+                print(f"Error closing tab {tab}: {e}")
+
+    def lease(self):
+        """
+        A ready tab (a new one if the pool is empty) for one client.
+        """
+        try:
+            tab = self.ready.get_nowait()
+        except queue.Empty:
+            tab = self._open_tab()
+        self.leased.add(tab)
+        return {"debugger_address": self.debugger_address, "tab": tab,
+                "pages": self.page_counts.get(tab, 0), "recycle_after": self.recycle_after}
+
+    def recycle(self, tab):
+        """
+        Replace a tab that has loaded recycle_after pages with a fresh one.
+        """
+        new_tab = self._open_tab()
+        self.leased.add(new_tab)
+        self.leased.discard(tab)
+        self.page_counts.pop(tab, None)
+        self._close_tab(tab)
+        self.recycled += 1
+        return {"tab": new_tab}
+
+    def release(self, tab, pages):
+        """
+        Return a tab that has loaded pages in total to the pool, replacing it first if
+        it has reached the recycle limit.
+        """
+        self.leased.discard(tab)
+        self.page_counts[tab] = pages
+        if pages >= self.recycle_after:
+            self.page_counts.pop(tab)
+            self._close_tab(tab)
+            self.recycled += 1
+            tab = self._open_tab()
+        self.ready.put(tab)
+        return {"tab": tab}
+
+    def status(self):
+        return {"site": self.site, "debugger_address": self.debugger_address,
+                "ready": self.ready.qsize(), "leased": len(self.leased),
+                "recycled": self.recycled}
+
+    def serve(self, port=None):
+        """
+        Serve lease/recycle/release/status on localhost until interrupted.
+        """
+        daemon = self
+        port = port or DAEMON_PORTS[self.site]
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                params = {key: values[0] for key, values in parse_qs(url.query).items()}
+                try:
+                    if url.path == "/lease":
+                        body = daemon.lease()
+                    elif url.path == "/recycle":
+                        body = daemon.recycle(params["tab"])
+                    elif url.path == "/release":
+                        body = daemon.release(params["tab"], int(params.get("pages", 0)))
+                    elif url.path == "/status":
+                        body = daemon.status()
+                    else:
+                        self.send_error(404)
+                        return
+                except Exception as e:
+                    self.send_error(500, str(e))
+                    return
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        print(f"Browser daemon for {self.site} listening on 127.0.0.1:{port}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            self.driver.quit()
+
+def _call(site, path, timeout=30):
+    url = f"http://127.0.0.1:{DAEMON_PORTS[site]}{path}"
+    with urllib.request.urlopen(url, timeout=timeout) as response:
+        return json.loads(response.read().decode("utf-8"))
+
+def running(site):
+    """
+    True when a daemon for site answers on its control port.
+    """
+    try:
+        _call(site, "/status", timeout=2)
+        return True
+    except Exception:
+        return False
+
+_driver_path = None
+
+def _patched_driver_path():
+    # Attach with undetected_chromedriver's patched chromedriver, as the daemon does.
+    global _driver_path
+    if _driver_path is None:
+        patcher = uc.Patcher()
+        patcher.auto()
+        _driver_path = patcher.executable_path
+    return _driver_path
+
+class AttachedChrome(webdriver.Chrome):
+    """
+    WebDriver attached to one leased tab of a running daemon. It counts page loads,
+    swaps in a fresh tab every recycle_after pages, and hands the tab back on quit()
+    without closing the browser.
+    """
+
+    def __init__(self, site, lean=True):
+        self.site = site
+        self.lease = _call(site, "/lease")
+        options = webdriver.ChromeOptions()
+        options.debugger_address = self.lease["debugger_address"]
+        if lean:
+            options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+        super().__init__(service=Service(_patched_driver_path()), options=options)
+        self.lean = lean
+        self._use_tab(self.lease["tab"], self.lease["pages"])
+
+    def _use_tab(self, tab, pages=0):
+        self.tab = tab
+        self.tab_pages = pages
+        self.switch_to.window(tab)
+        if self.lean:
+            # Request blocking is per tab, so it is set again on every new tab.
+            lean_browser.enable_lean_mode(self)
+
+    def get(self, url):
+        if self.tab_pages >= self.lease["recycle_after"]:
+            self._use_tab(_call(self.site, f"/recycle?tab={self.tab}")["tab"])
+        self.tab_pages += 1
+        super().get(url)
+
+    def quit(self):
+        try:
+            _call(self.site, f"/release?tab={self.tab}&pages={self.tab_pages}")
+        except Exception as e:
+            print(f"Error releasing tab {self.tab}: {e}")
+        super().quit()
+
+def attach(site, lean=True):
+    """
+    A driver on a ready tab of the site's daemon (see AttachedChrome).
+    """
+    return AttachedChrome(site, lean=lean)
+
+if __name__ == "__main__":
+    # python browser_daemon.py <site> [--visible] [--tabs N]
+    site = sys.argv[1] if len(sys.argv) > 1 else "yourstory"
+    tabs = int(sys.argv[sys.argv.index("--tabs") + 1]) if "--tabs" in sys.argv else DEFAULT_POOL_SIZE
+    daemon = BrowserDaemon(site, tabs=tabs, headless="--visible" not in sys.argv)
+    daemon.start()
+    daemon.serve()
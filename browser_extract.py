@@ -0,0 +1,85 @@
+# Extraction scripts run inside the page with execute_script, so only a compact JSON
+# list crosses the WebDriver channel instead of the whole serialized DOM. Each script
+# mirrors the BeautifulSoup parsing it replaces.
+
+# Same result as BeautifulSoup's get_text(strip=True): every text node stripped, joined.
+_STRIP_TEXT = """
+function stripText(el) {
+    if (!el) return null;
+    const walker = document.createTreeWalker(el, NodeFilter.SHOW_TEXT);
+    const parts = [];
+    while (walker.nextNode()) {
+        const text = walker.currentNode.nodeValue.trim();
+        if (text) parts.push(text);
+    }
+    return parts.join("");
+}
+"""
+
+YOURSTORY_RESULTS_JS = _STRIP_TEXT + """
+const container = document.querySelector("section.container-results");
+if (!container) return null;
+return Array.from(container.querySelectorAll("li.sc-c9f6afaa-0")).map(item => {
+    let title = null, link = null;
+    for (const a of item.querySelectorAll("a[href]")) {
+        const span = a.querySelector("span");
+        if (span) {
+            const text = stripText(span);
+            if (text) { title = text; link = a.getAttribute("href"); break; }
+        }
+    }
+    const dateTag = item.querySelector('span[class="sc-36431a7-0 dpmmXH"]');
+    const category = item.querySelector("div.sc-c9f6afaa-10.jqCVBY span");
+    return {title: title, link: link, date: stripText(dateTag), category: stripText(category)};
+});
+"""
+
+INC42_HITS_JS = _STRIP_TEXT + """
+const hitsList = document.querySelector("ol.ais-Hits-list");
+if (!hitsList) return null;
+const hits = [];
+for (const item of hitsList.querySelectorAll("li.ais-Hits-item")) {
+    const content = item.querySelector("div.ais-hits--content");
+    if (!content) continue;
+    const h2 = content.querySelector("h2.entry-title");
+    if (!h2) continue;
+    const a = h2.querySelector("a");
+    const date = content.querySelector("div.meta-wrapper span.date");
+    hits.push({
+        title: a ? stripText(a) : null,
+        link: a ? a.getAttribute("href") : null,
+        date: stripText(date),
+        category: null
+    });
+}
+return hits;
+"""
+
+EXCERPT_JS = _STRIP_TEXT + """
+const meta = document.querySelector('meta[name="description"]');
+if (meta && meta.getAttribute("content")) return meta.getAttribute("content").trim();
+const container = document.querySelector(arguments[0]);
+const p = container ? container.querySelector("p") : null;
+return p ? stripText(p) : "";
+"""
+
+def yourstory_results(driver):
+    """
+    YourStory search results as [{title, link, date, category}], or None when the
+    results container is missing.
+    """
+    return driver.execute_script(YOURSTORY_RESULTS_JS)
+
+def inc42_hits(driver):
+    """
+    Inc42 search hits as [{title, link, date, category}], or None when the hit list
+    is missing. Category is left for the caller to derive from the link.
+    """
+    return driver.execute_script(INC42_HITS_JS)
+
+def excerpt(driver, container_selector):
+    """
+    The page's meta description, or else the first paragraph inside the first
+    element matching container_selector, or "".
+    """
+    return driver.execute_script(EXCERPT_JS, container_selector) or ""
@@ -0,0 +1,87 @@
+import os
+import queue
+import threading
+
+# One Chrome per two cores by default; each browser is a separate process.
+DEFAULT_POOL_SIZE = max(1, (os.cpu_count() or 2) // 2)
+
+# undetected_chromedriver patches its driver binary on launch, so launches are serialized.
+_launch_lock = threading.Lock()
+
+class BrowserPool:
+    """
+    Runs work items across several browser instances, one worker thread per browser.
+    Browsers are launched with create_driver() on first use and kept open across
+    run() calls until close(); use the pool as a context manager.
+    """
+
+    def __init__(self, create_driver, size=DEFAULT_POOL_SIZE):
+        self.create_driver = create_driver
+        self.size = max(1, size)
+        self.lock = threading.Lock()
+        self.drivers = [None] * self.size
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _driver(self, index):
+        if self.drivers[index] is None:
+            with _launch_lock:
+                self.drivers[index] = self.create_driver()
+        return self.drivers[index]
+
+    def run(self, items, work, on_result):
+        """
+        Call work(driver, item) for every item, with the workers taking items from a
+        shared queue. on_result(item, result, error) is called for each item under
+        the pool lock, so it can safely merge results and write checkpoints; error
+        is the exception raised by work, if any.
+        """
+        items = list(items)
+        pending = queue.Queue()
+        for item in items:
+            pending.put(item)
+
+        def worker(index):
+            try:
+                driver = self._driver(index)
+            except Exception as e:
+                print(f"Browser {index} failed to start: {e}")
+                return
+            while True:
+                try:
+                    item = pending.get_nowait()
+                except queue.Empty:
+                    return
+                try:
+                    result, error = work(driver, item), None
+                except Exception as e:
+                    result, error = None, e
+                with self.lock:
+                    on_result(item, result, error)
+
+        workers = min(self.size, len(items))
+        threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Only happens when every browser failed to start.
+        if not pending.empty():
+            print(f"{pending.qsize()} items were not processed")
+
+    def close(self):
+        """
+        Quit every browser the pool launched.
+        """
+        for index, driver in enumerate(self.drivers):
+            if driver is not None:
+                try:
+                    driver.quit()
+                except Exception as e:
+                    print(f"Error closing browser {index}: {e}")
+                self.drivers[index] = None
@@ -0,0 +1,110 @@
+import threading
+import time
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+
+DEFAULT_TIMEOUT = 15
+POLL_INTERVAL = 0.2
+# An element count that has not changed for this long is considered settled.
+SETTLE_SECONDS = 1.0
+
+# label -> [count, total seconds, slowest, timeouts], for report(). Browser pool
+# tabs wait on several threads at once.
+_stats_lock = threading.Lock()
+stats = {}
+
+def _record(label, elapsed, timed_out):
+    with _stats_lock:
+        entry = stats.setdefault(label, [0, 0.0, 0.0, 0])
+        entry[0] += 1
+        entry[1] += elapsed
+        entry[2] = max(entry[2], elapsed)
+        if timed_out:
+            entry[3] += 1
+
+def wait_for(driver, condition, label, timeout=DEFAULT_TIMEOUT):
+    """
+    Poll condition(driver) until it returns something truthy or timeout passes.
+    Returns that value, or None on timeout; the wait time is recorded under label.
+    """
+    start = time.monotonic()
+    try:
+        result = WebDriverWait(driver, timeout, poll_frequency=POLL_INTERVAL).until(condition)
+        timed_out = False
+    except TimeoutException:
+        result, timed_out = None, True
+    elapsed = time.monotonic() - start
+    _record(label, elapsed, timed_out)
+    if timed_out:
+        print(f"Timed out after {elapsed:.1f}s waiting for {label}")
+    return result
+
+def document_ready(driver):
+    return driver.execute_script("return document.readyState") == "complete"
+
+def any_present(*selectors):
+    """
+    Condition that is met once any of the CSS selectors matches an element.
+    """
+    def condition(driver):
+        for selector in selectors:
+            if driver.find_elements(By.CSS_SELECTOR, selector):
+                return True
+        return False
+    return condition
+
+def count_stable(selector, settle=SETTLE_SECONDS):
+    """
+    Condition that is met once at least one element matches selector and the number
+    of matches has not changed for settle seconds. Returns that count.
+    """
+    state = {"count": -1, "since": time.monotonic()}
+
+    def condition(driver):
+        count = len(driver.find_elements(By.CSS_SELECTOR, selector))
+        now = time.monotonic()
+        if count != state["count"]:
+            state["count"], state["since"] = count, now
+            return False
+        return count if count and now - state["since"] >= settle else False
+    return condition
+
+def wait_until_ready(driver, label="document ready", timeout=DEFAULT_TIMEOUT):
+    return wait_for(driver, document_ready, label, timeout)
+
+def scroll_until_exhausted(driver, item_selector, label="infinite scroll",
+                           max_rounds=10, settle=SETTLE_SECONDS, timeout=DEFAULT_TIMEOUT):
+    """
+    Scroll to the bottom of the page until a scroll loads no new items matching
+    item_selector (or max_rounds is reached). Returns the final item count.
+    """
+    start = time.monotonic()
+    count = len(driver.find_elements(By.CSS_SELECTOR, item_selector))
+    for _ in range(max_rounds):
+        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+        previous = count
+
+        def grew(driver):
+            return len(driver.find_elements(By.CSS_SELECTOR, item_selector)) > previous
+
+        try:
+            WebDriverWait(driver, settle, poll_frequency=POLL_INTERVAL).until(grew)
+        except TimeoutException:
+            break
+        count = len(driver.find_elements(By.CSS_SELECTOR, item_selector))
+        if time.monotonic() - start > timeout:
+            break
+    _record(label, time.monotonic() - start, False)
+    return count
+
+def report():
+    """
+    Print how long each kind of wait took in this run.
+    """
+    with _stats_lock:
+        entries = sorted((label, list(entry)) for label, entry in stats.items())
+    for label, (count, total, slowest, timeouts) in entries:
+        print(f"Wait '{label}': {count}x, avg {total / count:.2f}s, max {slowest:.2f}s, "
+              f"{timeouts} timeouts")
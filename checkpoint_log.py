@@ -0,0 +1,149 @@
+import json
+import os
+import threading
+
+# Queries between rewrites of the final JSON artifact from the log.
+COMPACT_EVERY = 500
+
+class CheckpointLog:
+    """
+    Append-only, line-delimited checkpoint: one JSON record per finished query,
+    {"query": ..., "status": "ok" | "error", "results": [...], "error": ..., "pages": ...,
+    "attributed": [...]}.
+    Appending costs the same no matter how large the run is; compact() folds the
+    log into the final JSON artifact, with later records for a query replacing
+    earlier ones.
+    """
+
+    def __init__(self, path, output_path, shape="dict", keep_empty=False,
+                 compact_every=COMPACT_EVERY):
+        self.path = path
+        self.output_path = output_path
+        self.shape = shape
+        self.keep_empty = keep_empty
+        self.compact_every = compact_every
+        self._lock = threading.Lock()
+        self._file = None
+        self._appended = 0
+
+    def _handle(self):
+        if self._file is None:
+            torn = False
+            if os.path.exists(self.path) and os.path.getsize(self.path) > 0:
+                with open(self.path, "rb") as f:
+                    f.seek(-1, os.SEEK_END)
+                    torn = f.read(1) != b"\n"
+            self._file = open(self.path, "a", encoding="utf-8")
+            if torn:
+                # Terminate a line cut short by a crash so new records stay parseable.
+                self._file.write("\n")
+        return self._file
+
+    def reset(self):
+        """
+        Discard all previous records.
+        """
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            open(self.path, "w", encoding="utf-8").close()
+
+    def append(self, query, results, status="ok", error=None, pages=None, attributed=None):
+        """
+        Record one finished query (and the result page depth used, if given) and
+        compact periodically. attributed holds results kept only because they name
+        other entities; they are not part of the query's results.
+        """
+        record = {"query": query, "status": status, "results": results}
+        if error is not None:
+            record["error"] = str(error)
+        if pages is not None:
+            record["pages"] = pages
+        if attributed:
+            record["attributed"] = attributed
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            f = self._handle()
+            f.write(line + "\n")
+            f.flush()
+            self._appended += 1
+            due = self.compact_every and self._appended % self.compact_every == 0
+        if due:
+            self.compact()
+
+    def records(self):
+        """
+        Yield every record in the log, skipping a torn last line left by a crash.
+        """
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    print(f"Skipping unreadable checkpoint line in {self.path}")
+
+    def latest(self):
+        """
+        Map each query to its most recent record.
+        """
+        latest = {}
+        for record in self.records():
+            latest[record["query"]] = record
+        return latest
+
+    def resume(self, queries, fresh=False):
+        """
+        Return the queries that still need to run. Queries whose latest record
+        succeeded are skipped; failed ones are retried. With fresh=True the log is
+        discarded and every query is returned.
+        """
+        queries = list(queries)
+        if fresh:
+            self.reset()
+            return queries
+        latest = self.latest()
+        done = {query for query, record in latest.items() if record.get("status") == "ok"}
+        remaining = [query for query in queries if query not in done]
+        retried = sum(1 for query in remaining if query in latest)
+        print(f"Resuming from {self.path}: {len(queries) - len(remaining)} queries already done, "
+              f"{retried} failed earlier and will be retried, {len(remaining)} left to run")
+        return remaining
+
+    def compact(self):
+        """
+        Write the final JSON artifact (dict of query -> results, a list of
+        {"query", "results"} entries, or with shape "records" a flat list of the
+        results, each with its "query") from the log, replacing it atomically.
+        """
+        latest = self.latest()
+        entries = [(query, record.get("results") or []) for query, record in latest.items()
+                   if record.get("status") == "ok"]
+        if not self.keep_empty:
+            entries = [(query, results) for query, results in entries if results]
+        if self.shape == "list":
+            data = [{"query": query, "results": results} for query, results in entries]
+        elif self.shape == "records":
+            data = [dict(result, query=query) for query, results in entries for result in results]
+        else:
+            data = dict(entries)
+
+        tmp_path = self.output_path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=4)
+            os.replace(tmp_path, self.output_path)
+            print(f"Checkpoint compacted into {self.output_path} ({len(entries)} queries)")
+        except Exception as e:
+            print(f"Error compacting checkpoint: {e}")
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
@@ -0,0 +1,146 @@
+import json
+import os
+import re
+import unicodedata
+from collections import deque
+
+from query_manifest import FOUNDERS_COMPANIES_PATH, load_manifest
+
+# Keys shorter than this match too much to be useful.
+MIN_NAME_LENGTH = 3
+
+_WORD = re.compile(r"\w+")
+
+def fold(text):
+    """Case-folded text with accents removed, comparable with manifest keys."""
+    if not text.isascii():
+        text = "".join(c for c in unicodedata.normalize("NFKD", text)
+                       if not unicodedata.combining(c))
+    return text.casefold()
+
+def words(text):
+    return _WORD.findall(fold(text))
+
+def article_text(article):
+    """The text of an article record that entities are looked for in."""
+    return f"{article.get('title') or ''}\n{article.get('excerpt') or ''}"
+
+class EntityMatcher:
+    """
+    Aho-Corasick automaton over the words of every manifest query's folded key.
+    One pass over a text finds every query it names, overlapping ones included;
+    working on whole words gives word boundaries for free.
+    """
+
+    def __init__(self, queries):
+        self.queries = {query["key"]: query for query in queries
+                        if len(query["key"]) >= MIN_NAME_LENGTH}
+        self.keys_by_text = {query["text"]: key for key, query in self.queries.items()}
+        # Trie of key word sequences: goto[node] maps a word to the next node.
+        self.goto = [{}]
+        self.output = [[]]
+        for key in self.queries:
+            node = 0
+            for word in words(key):
+                if word not in self.goto[node]:
+                    self.goto.append({})
+                    self.output.append([])
+                    self.goto[node][word] = len(self.goto) - 1
+                node = self.goto[node][word]
+            if node:
+                self.output[node].append(key)
+        # Failure links by breadth-first search; each node also reports the keys
+        # of its longest proper suffix that is a trie node.
+        self.fail = [0] * len(self.goto)
+        pending = deque(self.goto[0].values())
+        while pending:
+            node = pending.popleft()
+            for word, child in self.goto[node].items():
+                fallback = self.fail[node]
+                while fallback and word not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(word, 0)
+                self.output[child] = self.output[child] + self.output[self.fail[child]]
+                pending.append(child)
+
+    def __contains__(self, query):
+        return query in self.keys_by_text
+
+    def find(self, text):
+        """Keys of every query named in text."""
+        found = set()
+        goto, fail, output = self.goto, self.fail, self.output
+        node = 0
+        for word in words(text):
+            while node and word not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(word, 0)
+            if output[node]:
+                found.update(output[node])
+        return found
+
+    def entities(self, text):
+        """Display names of every query named in text, sorted."""
+        return sorted(self.queries[key]["text"] for key in self.find(text))
+
+    def mentions(self, text, query):
+        """
+        True when text names query. Queries outside the manifest are looked for
+        as a run of whole words.
+        """
+        key = self.keys_by_text.get(query)
+        if key is not None:
+            return key in self.find(text)
+        needle, haystack = words(query), words(text)
+        return bool(needle) and any(haystack[start:start + len(needle)] == needle
+                                    for start in range(len(haystack) - len(needle) + 1))
+
+    def article_entities(self, article):
+        """
+        The names an article record mentions, found on first use and kept in its
+        "entities", so later checks don't scan the text again.
+        """
+        if "entities" not in article:
+            article["entities"] = self.entities(article_text(article))
+        return article["entities"]
+
+    def annotate(self, articles):
+        """Set each article's "entities" to the names it mentions; returns articles."""
+        for article in articles:
+            article["entities"] = self.entities(article_text(article))
+        return articles
+
+_matcher = None
+
+def get_matcher(path=FOUNDERS_COMPANIES_PATH):
+    """The matcher for the whole manifest, built on first use."""
+    global _matcher
+    if _matcher is None:
+        _matcher = EntityMatcher(load_manifest(path))
+    return _matcher
+
+def attribution(records):
+    """
+    Map every entity to the annotated articles that mention it, de-duplicated by
+    link, from checkpoint records' "results" and "attributed" lists.
+    """
+    credited = {}
+    seen = set()
+    for record in records:
+        if record.get("status") != "ok":
+            continue
+        for article in (record.get("results") or []) + (record.get("attributed") or []):
+            for entity in article.get("entities", []):
+                if (entity, article.get("link")) not in seen:
+                    seen.add((entity, article.get("link")))
+                    credited.setdefault(entity, []).append(article)
+    return dict(sorted(credited.items()))
+
+def write_attribution(checkpoint, path):
+    """Write the entity -> articles attribution of a checkpoint's latest records."""
+    credited = attribution(checkpoint.latest().values())
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(credited, f, ensure_ascii=False, indent=4)
+    os.replace(tmp_path, path)
+    print(f"Attributed articles to {len(credited)} entities in {path}")
@@ -1,34 +1,47 @@
-import requests
-from bs4 import BeautifulSoup
-import json
-import pandas as pd
 import os
-import ast
-import time
-import random
+import sys
+
+import http_client
+import pagination
+import rate_limit
+import wp_rest
+from html_parsing import make_soup, FACTORDAILY_RESULTS
+from checkpoint_log import CheckpointLog
+from http_cache import get_cache
+from query_manifest import manifest_queries
+from retry_queue import RetryQueue, take_dead_letters
+
+# Search through the WordPress REST API and parse the HTML search pages only if it
+# is unavailable.
+WP_REST_API = True
+# Deepest result page read per query; pagination stops earlier when pages run dry.
+MAX_PAGES = pagination.DEFAULT_MAX_PAGES
 
 def scrape_factordaily(query, page=1):
     """
     Scrape Factordaily for articles related to the given query.
     """
+    if WP_REST_API:
+        try:
+            return wp_rest.search_posts("factordaily", query, page, missing=None)
+        except wp_rest.ApiUnavailable as e:
+            print(f"{e}; falling back to the HTML search page")
+
     if page == 1:
         url = f"https://factordaily.com/?s={query}"
     else:
         url = f"https://factordaily.com/page/{page}/?s={query}"
     
     print(f"Scraping URL: {url}")
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                      "AppleWebKit/537.36 (KHTML, like Gecko) "
-                      "Chrome/91.0.4472.124 Safari/537.36"
-    }
-    
-    response = requests.get(url, headers=headers)
+    response = http_client.get(url)
     if response.status_code != 200:
+        if page > 1 and response.status_code == 404:
+            # Past the last page of results.
+            return []
         print(f"Failed to fetch {url}: Status code {response.status_code}")
-        return []
+        response.raise_for_status()
     
-    soup = BeautifulSoup(response.text, 'html.parser')
+    soup = make_soup(response.text, FACTORDAILY_RESULTS)
     search_post_list = soup.find("div", class_="search-post-list")
     if not search_post_list:
         print("No search post list found on the page.")
@@ -91,97 +104,67 @@ def scrape_factordaily(query, page=1):
         })
     return results
 
-def load_json_data(json_filepath):
+# One line per finished query; compacted into the query -> posts JSON.
+checkpoint = CheckpointLog("factordaily_results.jsonl", "factordaily_results.json")
+# Failed queries are retried between fresh ones; those that keep failing are
+# written here and can be rerun with --replay.
+retries = RetryQueue("factordaily_dead_letter.jsonl")
+
+def scrape_query(query, attempt=0):
     """
-    Load JSON data from the specified filepath.
+    Scrape every useful result page for a query into the checkpoint log, or file
+    it for a retry if it fails.
     """
+    print(f"\n--- Scraping results for query: '{query}' ---")
+    page_size = wp_rest.page_size("factordaily") if WP_REST_API else None
     try:
-        with open(json_filepath, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        print(f"Loaded JSON data from {json_filepath}")
-        return data
+        posts, depth = pagination.paginate(lambda page: scrape_factordaily(query, page), query,
+                                           max_pages=MAX_PAGES, page_size=page_size)
     except Exception as e:
-        print(f"Error loading JSON file {json_filepath}: {e}")
-        return None
+        print(f"Error scraping query '{query}': {e}")
+        if not retries.schedule(query, e, attempt + 1):
+            checkpoint.append(query, [], status="error", error=e)
+        return
+    checkpoint.append(query, posts, pages=depth)
 
-def save_checkpoint(results):
+def main(fresh=False, replay=False):
     """
-    Save/update a checkpoint file with the current results.
+    Scrape every query not yet completed in the checkpoint log.
+    Pass --fresh on the command line to discard previous progress and start over,
+    or --replay to rerun only the queries in the dead-letter file.
     """
-    checkpoint_filename = "factordaily_results.json"
-    try:
-        with open(checkpoint_filename, "w", encoding="utf-8") as f:
-            json.dump(results, f, ensure_ascii=False, indent=4)
-        print(f"Checkpoint updated: {checkpoint_filename}")
-    except Exception as e:
-        print(f"Error saving checkpoint: {e}")
-
-def main():
     json_filepath = "founders_companies.json"
     
     if not os.path.exists(json_filepath):
         print(f"JSON file {json_filepath} does not exist. Please create it from your CSV first.")
         return
-    
-    data = load_json_data(json_filepath)
-    if data is None:
-        return
-    
-    df = pd.DataFrame(data)
-    
-    queries = set()
-    # Process Founders column: separate out individual names if the entry is a list.
-    if 'Founders' in df.columns:
-        for entry in df['Founders'].dropna().unique().tolist():
-            try:
-                founder_list = ast.literal_eval(entry)
-                if isinstance(founder_list, list):
-                    for name in founder_list:
-                        if name:
-                            queries.add(name.strip())
-                else:
-                    queries.add(str(founder_list).strip())
-            except Exception as e:
-                print(f"Error parsing founders entry: {entry}. Error: {e}")
-                queries.add(entry.strip())
-    else:
-        print("Column 'Founders' not found in JSON data.")
-    
-    # Process Company column: add each company name as a query.
-    if 'Company' in df.columns:
-        companies = df['Company'].dropna().unique().tolist()
-        for company in companies:
-            if company and company.strip():
-                queries.add(company.strip())
+
+    if replay:
+        queries = take_dead_letters(retries.dead_letter_path)
     else:
-        print("Column 'Company' not found in JSON data.")
-    
-    queries = [q for q in queries if q]
-    print(f"Total unique queries to search (Founders & Companies): {len(queries)}")
-    
-    all_results = {}
-    processed_count = 0
-    
-   
-    save_checkpoint(all_results)
+        queries = manifest_queries(json_filepath)
+        print(f"Total unique queries to search (Founders & Companies): {len(queries)}")
+        queries = checkpoint.resume(queries, fresh=fresh)
     
     for query in queries:
-        print(f"\n--- Scraping results for query: '{query}' ---")
-        posts = scrape_factordaily(query, page=1)
-        if posts:
-            all_results[query] = posts
-        
-        processed_count += 1
-        
-      
-        if processed_count % 2 == 0:
-            save_checkpoint(all_results)
-            
-            
-    
-    
-    save_checkpoint(all_results)
+        scrape_query(query)
+        # Retries whose backoff has run out are taken between fresh queries.
+        for retry, attempt in retries.due():
+            scrape_query(retry, attempt)
+
+    # Then wait out the remaining retries.
+    while len(retries):
+        retries.wait()
+        for retry, attempt in retries.due():
+            scrape_query(retry, attempt)
+    
+    checkpoint.compact()
+    checkpoint.close()
+    get_cache().report()
+    pagination.report()
+    rate_limit.report()
+    retries.report()
     print("Scraping completed.")
 
 if __name__ == "__main__":
-    main()
+    main(fresh="--fresh" in sys.argv, replay="--replay" in sys.argv)
@@ -0,0 +1,373 @@
+import bz2
+import gzip
+import json
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+# Local stand-ins for the JSON sources, serving a small fixed corpus so the API
+# modes can be run offline. Start it with `python fake_endpoints.py [port]` and
+# export the printed environment variables before running a scraper.
+
+FAKE_ALGOLIA_APP_ID = "FAKEAPP"
+FAKE_ALGOLIA_API_KEY = "fake-search-key"
+FAKE_ALGOLIA_INDEX = "wp_searchable_posts"
+FAKE_REDDIT_TOKEN = "fake-reddit-token"
+# Requests allowed per rate-limit window of the fake Reddit API, and its length.
+REDDIT_RATE_LIMIT = 100
+REDDIT_RATE_WINDOW = 600
+
+INC42_POSTS = [
+    {
+        "post_title": "100ms Raises $20 Mn To Power Live Video Apps",
+        "permalink": "https://inc42.com/buzz/100ms-raises-20-mn/",
+        "post_date_formatted": "August 25, 2023",
+        "post_excerpt": "Live video infrastructure startup <strong>100ms</strong> has raised $20 Mn&hellip;",
+        "content": "100ms, founded by Kshitij Gupta and Aniket Behera, raised funding.",
+    },
+    {
+        "post_title": "How Atul Todi Built 10Times Into An Events Marketplace",
+        "permalink": "https://inc42.com/features/atul-todi-10times/",
+        "post_date_formatted": "March 3, 2024",
+        "post_excerpt": "The 10Times cofounder on discovery for business events.",
+        "content": "Atul Todi and Mayank Chowdhary talk about 10Times.",
+    },
+    {
+        "post_title": "Meet The Indians Building Developer Tools",
+        "permalink": "https://inc42.com/startups/indians-developer-tools/",
+        "post_date_formatted": "January 9, 2024",
+        "post_excerpt": "",
+        "content": "A look at bootstrapped developer tools startups.",
+    },
+]
+
+YOURSTORY_STORIES = [
+    {
+        "title": "100ms raises $20M to make live video easy for developers",
+        "path": "/2023/08/100ms-raises-20m-live-video",
+        "publishedAt": "2023-08-25T10:00:00Z",
+        "category": {"name": "Funding"},
+        "subtitle": "The startup founded by Kshitij Gupta and Aniket Behera&hellip;",
+    },
+    {
+        "title": "Kshitij Gupta on building video infrastructure",
+        "path": "/2024/02/kshitij-gupta-100ms-interview",
+        "publishedAt": "2024-02-12T08:30:00Z",
+        "category": {"name": "Interview"},
+        "subtitle": "",
+    },
+    {
+        "title": "10Times pivots to hybrid events",
+        "path": "/2022/05/10times-hybrid-events",
+        "publishedAt": "2022-05-02T06:00:00Z",
+        "category": {"name": "Startup"},
+        "subtitle": "Atul Todi and Mayank Chowdhary on the next phase.",
+    },
+]
+def _wp_post(title, link, date, excerpt, category, author):
+    return {
+        "id": abs(hash(link)) % 100000,
+        "date": date,
+        "link": link,
+        "title": {"rendered": title},
+        "excerpt": {"rendered": f"<p>{excerpt}</p>\n"},
+        "content": {"rendered": f"<p>{excerpt} Full story.</p>"},
+        "_links": {"self": [{"href": link}]},
+        "_embedded": {
+            "author": [{"id": 1, "name": author}],
+            "wp:term": [[{"id": 2, "name": category, "taxonomy": "category"}],
+                        [{"id": 3, "name": "Funding", "taxonomy": "post_tag"}]],
+        },
+    }
+
+WP_POSTS = {
+    "techcrunch": [
+        _wp_post("100ms raises $20M Series B for its live video SDK",
+                 "https://techcrunch.com/2022/01/11/100ms-series-b/", "2022-01-11T05:30:00",
+                 "Founded by Kshitij Gupta and Aniket Behera, 100ms&#8217;s SDK powers live video.",
+                 "Startups", "Manish Singh"),
+        _wp_post("10Times and the business of event discovery",
+                 "https://techcrunch.com/2019/06/04/10times-events/", "2019-06-04T09:00:00",
+                 "Atul Todi says 10Times lists millions of events.", "Apps", "Jon Russell"),
+    ],
+    "factordaily": [
+        _wp_post("Inside 100ms, the video infra startup",
+                 "https://factordaily.com/100ms-video-infra/", "2021-09-20T07:00:00",
+                 "Kshitij Gupta left Disney+ Hotstar to build 100ms.", "Startups", "FactorDaily Staff"),
+    ],
+}
+
+REDDIT_SUBMISSIONS = [
+    {"title": "100ms vs Agora for live video in a startup app?",
+     "selftext": "We are choosing a video SDK.", "url": "https://www.reddit.com/r/webdev/comments/a1/",
+     "score": 42, "num_comments": 17},
+    {"title": "AMA: Kshitij Gupta, cofounder of 100ms",
+     "selftext": "", "url": "https://www.reddit.com/r/developersIndia/comments/a2/",
+     "score": 310, "num_comments": 128},
+    {"title": "Used 10Times to find trade shows, worth it?",
+     "selftext": "Atul Todi's platform lists a lot of events.",
+     "url": "https://www.reddit.com/r/smallbusiness/comments/a3/", "score": 5, "num_comments": 9},
+    {"title": "Best budget mics for streaming",
+     "selftext": "Latency under 100 ms matters to me.",
+     "url": "https://www.reddit.com/r/audio/comments/a4/", "score": 12, "num_comments": 30},
+    {"title": "Jeremiah Anderson with the pick-six in the fourth quarter",
+     "selftext": "", "url": "https://www.reddit.com/r/nfl/comments/a5/", "score": 2200,
+     "num_comments": 410},
+    {"title": "SmartRent earnings call",
+     "selftext": "CEO Jeremiah Anderson's comments on guidance.",
+     "url": "https://www.reddit.com/r/stocks/comments/a6/", "score": 88, "num_comments": 51},
+]
+
+# Sites whose fake REST API is switched off with the given status, and one that
+# answers with an HTML page instead of a post list.
+WP_UNAVAILABLE = {"locked": 401, "blocked": 403, "gone": 410}
+WP_HTML_SITE = "html"
+# Site that rejects the request's parameters, as WordPress does for an unknown _fields.
+WP_INVALID_PARAM_SITE = "strict"
+
+# Page served as text/html without a charset.
+NO_CHARSET_PATH = "/no-charset"
+
+# Stories per YourStory search page, so multi-page queries can be exercised, and a
+# query answered with a challenge page that has no hydration payload.
+YOURSTORY_PAGE_SIZE = 2
+YOURSTORY_CHALLENGE_QUERY = "challenge"
+
+def _matches(post, query, fields):
+    query = query.casefold()
+    return bool(query) and any(query in (post.get(field) or "").casefold() for field in fields)
+
+class FakeHandler(BaseHTTPRequestHandler):
+    # Fake Reddit rate-limit window shared by all requests.
+    reddit_window = {"started": time.monotonic(), "used": 0}
+    reddit_lock = threading.Lock()
+
+    def _send_json(self, body, status=200, headers=None):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_html(self, html, content_type="text/html; charset=utf-8"):
+        data = html.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/inc42/":
+            # Search page carrying the Algolia client config, for discover_config().
+            config = {"application_id": FAKE_ALGOLIA_APP_ID,
+                      "search_api_key": FAKE_ALGOLIA_API_KEY,
+                      "indices": {"searchable_posts": {"name": FAKE_ALGOLIA_INDEX}}}
+            self._send_html(f"<html><head><script>var algolia = {json.dumps(config)};"
+                            "</script></head><body></body></html>")
+        elif url.path.endswith("/wp-json/wp/v2/posts"):
+            self._wp_posts(url.path.split("/")[1], parse_qs(url.query))
+        elif url.path == NO_CHARSET_PATH:
+            # An article page whose Content-Type names no charset.
+            self._send_html('<html><head><meta name="description" content="Hello">'
+                            "</head><body><p>Hello, in full.</p></body></html>",
+                            content_type="text/html")
+        elif url.path.startswith("/status/"):
+            # Fails with the given status, e.g. /status/500 for a flaky article page.
+            self.send_error(int(url.path.split("/")[2]))
+        elif url.path == "/r/all/search":
+            self._reddit_search(parse_qs(url.query))
+        elif url.path == "/search":
+            self._yourstory_search(parse_qs(url.query))
+        elif any(story["path"] == url.path for story in YOURSTORY_STORIES):
+            story = next(story for story in YOURSTORY_STORIES if story["path"] == url.path)
+            self._send_html(f"<html><head><title>{story['title']}</title></head><body>"
+                            f"<article><p>{story['title']}, in full.</p></article></body></html>")
+        else:
+            self.send_error(404)
+
+    def _yourstory_search(self, params):
+        query = params.get("q", [""])[0]
+        page = int(params.get("page", ["1"])[0])
+        if query == YOURSTORY_CHALLENGE_QUERY:
+            self._send_html("<html><head><title>Just a moment...</title></head>"
+                            "<body>Checking your browser.</body></html>")
+            return
+        stories = [story for story in YOURSTORY_STORIES
+                   if _matches(story, query, ("title", "subtitle"))]
+        start = (page - 1) * YOURSTORY_PAGE_SIZE
+        # The SEO block and navigation entries have a title and a link too, but are
+        # not results.
+        data = {"props": {"pageProps": {"seo": {"title": "Search results | YourStory",
+                                                "url": "https://yourstory.com/search"},
+                                        "navigation": [{"title": "Funding", "slug": "funding"},
+                                                       {"title": "Tech", "slug": "tech"}],
+                                        "query": query, "page": page,
+                                        "totalResults": len(stories),
+                                        "stories": stories[start:start + YOURSTORY_PAGE_SIZE]}},
+                "page": "/search"}
+        self._send_html('<html><head></head><body><div id="__next"></div>'
+                        '<script id="__NEXT_DATA__" type="application/json">'
+                        f"{json.dumps(data)}</script></body></html>")
+
+    def _reddit_search(self, params):
+        if self.headers.get("Authorization") != f"bearer {FAKE_REDDIT_TOKEN}":
+            self._send_json({"message": "Unauthorized", "error": 401}, 401)
+            return
+        with self.reddit_lock:
+            window = self.reddit_window
+            now = time.monotonic()
+            if now - window["started"] >= REDDIT_RATE_WINDOW:
+                window.update(started=now, used=0)
+            window["used"] += 1
+            used = window["used"]
+            reset = REDDIT_RATE_WINDOW - (now - window["started"])
+        headers = {"X-Ratelimit-Used": str(used),
+                   "X-Ratelimit-Remaining": f"{max(0, REDDIT_RATE_LIMIT - used):.1f}",
+                   "X-Ratelimit-Reset": str(int(reset))}
+        if used > REDDIT_RATE_LIMIT:
+            self._send_json({"message": "Too Many Requests", "error": 429}, 429, headers)
+            return
+        # Quoted phrases OR-ed together, or a bare query.
+        query = params.get("q", [""])[0]
+        phrases = re.findall(r'"([^"]+)"', query) or [query]
+        limit = int(params.get("limit", ["25"])[0])
+        submissions = [submission for submission in REDDIT_SUBMISSIONS
+                       if any(_matches(submission, phrase, ("title", "selftext")) for phrase in phrases)]
+        listing = {"kind": "Listing",
+                   "data": {"after": None,
+                            "children": [{"kind": "t3", "data": submission}
+                                         for submission in submissions[:limit]]}}
+        self._send_json(listing, headers=headers)
+
+    def _wp_posts(self, site, params):
+        if site in WP_UNAVAILABLE:
+            status = WP_UNAVAILABLE[site]
+            self._send_json({"code": "rest_forbidden", "data": {"status": status}}, status)
+            return
+        if site == WP_INVALID_PARAM_SITE:
+            self._send_json({"code": "rest_invalid_param", "message": "Invalid parameter(s): _fields",
+                             "data": {"status": 400}}, 400)
+            return
+        if site == WP_HTML_SITE:
+            self._send_html("<html><body>Just a moment...</body></html>")
+            return
+        if site not in WP_POSTS:
+            self._send_json({"code": "rest_no_route", "data": {"status": 404}}, 404)
+            return
+        query = params.get("search", [""])[0]
+        page = int(params.get("page", ["1"])[0])
+        per_page = int(params.get("per_page", ["10"])[0])
+        posts = [post for post in WP_POSTS[site]
+                 if query.casefold() in (post["title"]["rendered"] + post["excerpt"]["rendered"]).casefold()]
+        pages = max(1, -(-len(posts) // per_page))
+        if page > pages:
+            self._send_json({"code": "rest_post_invalid_page_number",
+                             "data": {"status": 400}}, 400)
+            return
+        posts = posts[(page - 1) * per_page:page * per_page]
+        fields = params.get("_fields", [""])[0]
+        if fields:
+            fields = fields.split(",")
+            posts = [{key: post[key] for key in fields if key in post} for post in posts]
+        self._send_json(posts)
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+        if url.path == "/1/indexes/*/queries":
+            self._algolia_queries(json.loads(body or b"{}"))
+        elif url.path == "/api/v1/access_token":
+            self._send_json({"access_token": FAKE_REDDIT_TOKEN, "token_type": "bearer",
+                             "expires_in": 86400, "scope": "*"})
+        else:
+            self.send_error(404)
+
+    def _algolia_queries(self, body):
+        if (self.headers.get("X-Algolia-Application-Id") != FAKE_ALGOLIA_APP_ID
+                or self.headers.get("X-Algolia-API-Key") != FAKE_ALGOLIA_API_KEY):
+            self._send_json({"message": "Invalid Application-ID or API key", "status": 403}, 403)
+            return
+        results = []
+        for request in body.get("requests", []):
+            params = {key: values[0] for key, values in parse_qs(request.get("params", "")).items()}
+            query = params.get("query", "")
+            hits_per_page = int(params.get("hitsPerPage", 20))
+            attributes = json.loads(params.get("attributesToRetrieve", "null"))
+            hits = [post for post in INC42_POSTS
+                    if _matches(post, query, ("post_title", "post_excerpt", "content"))]
+            if attributes:
+                hits = [{key: post[key] for key in attributes if key in post} for post in hits]
+            results.append({"index": request.get("indexName"), "query": query,
+                            "nbHits": len(hits), "hits": hits[:hits_per_page]})
+        self._send_json({"results": results})
+
+    def log_message(self, format, *args):
+        pass
+
+def write_reddit_dump(path, copies=1):
+    """
+    Write the fake submissions as a newline-delimited dump for reddit_dumps, compressed
+    by path's extension (.zst, .gz, .bz2, or plain). copies repeats the corpus (with
+    distinct permalinks) to make a larger file.
+    """
+    lines = []
+    for copy in range(copies):
+        for number, submission in enumerate(REDDIT_SUBMISSIONS):
+            subreddit = submission["url"].split("/r/")[1].split("/")[0]
+            permalink = f"/r/{subreddit}/comments/{copy}x{number}/"
+            lines.append(json.dumps(dict(submission, subreddit=subreddit, permalink=permalink,
+                                         url=f"https://www.reddit.com{permalink}",
+                                         is_self=True, created_utc=1700000000 + copy)))
+    data = ("\n".join(lines) + "\n").encode("utf-8")
+    if path.endswith(".zst"):
+        import zstandard
+        data = zstandard.ZstdCompressor().compress(data)
+    elif path.endswith(".gz"):
+        data = gzip.compress(data)
+    elif path.endswith(".bz2"):
+        data = bz2.compress(data)
+    with open(path, "wb") as f:
+        f.write(data)
+
+def start(port=0):
+    """
+    Serve the fake endpoints on localhost from a background thread.
+    Returns (server, base_url); call server.shutdown() to stop.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", port), FakeHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+def environment(base_url):
+    """Environment variables pointing the JSON sources at the fake endpoints."""
+    return {
+        "INC42_ALGOLIA_URL": base_url,
+        "INC42_ALGOLIA_APP_ID": FAKE_ALGOLIA_APP_ID,
+        "INC42_ALGOLIA_API_KEY": FAKE_ALGOLIA_API_KEY,
+        "INC42_ALGOLIA_INDEX": FAKE_ALGOLIA_INDEX,
+        "YOURSTORY_BASE_URL": base_url,
+        "TECHCRUNCH_WP_BASE": f"{base_url}/techcrunch",
+        "FACTORDAILY_WP_BASE": f"{base_url}/factordaily",
+        "REDDIT_TOKEN_URL": f"{base_url}/api/v1/access_token",
+        "REDDIT_OAUTH_BASE": base_url,
+    }
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8765
+    server, base_url = start(port)
+    print(f"Fake endpoints on {base_url}")
+    for key, value in environment(base_url).items():
+        print(f"export {key}={value}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
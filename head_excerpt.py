@@ -0,0 +1,146 @@
+import codecs
+from html.parser import HTMLParser
+
+import http_client
+from http_cache import get_cache, ttl_for
+
+CHUNK_SIZE = 8192
+
+# Bytes downloaded and how often the <head> alone was enough, for this run.
+stats = {"head_only": 0, "full_body": 0, "bytes": 0}
+
+class MetaDescriptionParser(HTMLParser):
+    """
+    Incremental parser that watches for the first <meta name="description"> and
+    for the end of <head>.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.meta_seen = False
+        self.description = None
+        self.head_done = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "meta" and not self.meta_seen:
+            attrs = dict(attrs)
+            if attrs.get("name") == "description":
+                self.meta_seen = True
+                if attrs.get("content"):
+                    self.description = attrs["content"].strip()
+        elif tag == "body":
+            self.head_done = True
+
+    def handle_endtag(self, tag):
+        if tag == "head":
+            self.head_done = True
+
+class HeadExcerptReader:
+    """
+    Accumulates a response body chunk by chunk and reports when the meta
+    description has been found or the head has ended without one.
+    """
+
+    def __init__(self, encoding=None):
+        self.encoding = encoding or "utf-8"
+        self._decoder = codecs.getincrementaldecoder(self.encoding)(errors="replace")
+        self._parser = MetaDescriptionParser()
+        self._chunks = []
+        self.scanning = True
+
+    @property
+    def description(self):
+        return self._parser.description
+
+    def feed(self, chunk):
+        """
+        Add a chunk. Returns True once the head scan is over, either with a
+        description or because the body is needed.
+        """
+        self._chunks.append(chunk)
+        stats["bytes"] += len(chunk)
+        if self.scanning:
+            self._parser.feed(self._decoder.decode(chunk))
+            if self._parser.meta_seen or self._parser.head_done:
+                self.scanning = False
+        return not self.scanning
+
+    def body(self):
+        return b"".join(self._chunks)
+
+    def text(self):
+        return self.body().decode(self.encoding, errors="replace")
+
+def stream_excerpt(url, parse_full, session=None):
+    """
+    Fetch url and return its meta description, stopping the download as soon as it
+    has been read from <head>. Otherwise the whole page is read and parse_full(html)
+    decides the excerpt. Cached pages are parsed without any request.
+    session overrides the shared http_client session. Raises on HTTP errors.
+    """
+    cache = get_cache()
+    cached = cache.lookup(url)
+    if cached and (cache.offline or cached.is_fresh(ttl_for(url))):
+        cache.record_hit()
+        return parse_full(cached.text)
+
+    response = http_client.get(url, stream=True, session=session)
+    try:
+        response.raise_for_status()
+        reader = HeadExcerptReader(response.encoding)
+        chunks = response.iter_content(chunk_size=CHUNK_SIZE)
+        for chunk in chunks:
+            if reader.feed(chunk):
+                break
+        if reader.description is not None:
+            stats["head_only"] += 1
+            return reader.description
+        for chunk in chunks:
+            reader.feed(chunk)
+    finally:
+        response.close()
+
+    stats["full_body"] += 1
+    cache.record_miss()
+    cache.store(url, response.status_code, reader.body(), encoding=reader.encoding,
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified"))
+    return parse_full(reader.text())
+
+async def stream_excerpt_async(fetcher, url, parse_full):
+    """
+    Async counterpart of stream_excerpt using an AsyncFetcher.
+    """
+    cache = fetcher.cache
+    cached = cache.lookup(url) if cache else None
+    if cached and (cache.offline or cached.is_fresh(ttl_for(url))):
+        cache.record_hit()
+        return parse_full(cached.text)
+
+    async with fetcher.stream(url) as response:
+        # get_encoding() would sniff a body that has not been read yet.
+        reader = HeadExcerptReader(response.charset)
+        chunks = response.content.iter_chunked(CHUNK_SIZE)
+        async for chunk in chunks:
+            if reader.feed(chunk):
+                break
+        if reader.description is not None:
+            stats["head_only"] += 1
+            return reader.description
+        async for chunk in chunks:
+            reader.feed(chunk)
+
+    stats["full_body"] += 1
+    if cache:
+        cache.record_miss()
+        cache.store(url, response.status, reader.body(), encoding=reader.encoding,
+                    etag=response.headers.get("ETag"),
+                    last_modified=response.headers.get("Last-Modified"))
+    return parse_full(reader.text())
+
+def report():
+    """
+    Print how many excerpts were read from <head> alone and the bytes downloaded.
+    """
+    print(f"Streaming excerpts: {stats['head_only']} from <head> only, "
+          f"{stats['full_body']} needed the full body, {stats['bytes'] / 1024:.0f} KiB read")
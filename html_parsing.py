@@ -0,0 +1,100 @@
+import os
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+def _pick_backend():
+    # SCRAPER_HTML_PARSER forces a BeautifulSoup tree builder ("lxml" or "html.parser").
+    forced = os.environ.get("SCRAPER_HTML_PARSER")
+    if forced:
+        return forced
+    try:
+        import lxml  # noqa: F401
+        return "lxml"
+    except ImportError:
+        return "html.parser"
+
+PARSER_BACKEND = _pick_backend()
+# Excerpt lookups use selectolax when it is installed and no parser was forced.
+USE_SELECTOLAX = LexborHTMLParser is not None and not os.environ.get("SCRAPER_HTML_PARSER")
+
+def has_class(class_name):
+    """
+    SoupStrainer class_ test matching one class among several. While parsing, a
+    strainer given a plain string compares it with the whole class attribute, so
+    "wp-block-post-template is-layout-flow" would not match "wp-block-post-template".
+    """
+    def check(value):
+        if value is None:
+            return False
+        tokens = value.split() if isinstance(value, str) else value
+        return class_name in tokens
+    return check
+
+# Subtrees each scraper actually reads; everything outside them is skipped while parsing.
+TECHCRUNCH_RESULTS = SoupStrainer("ul", class_=has_class("wp-block-post-template"))
+FACTORDAILY_RESULTS = SoupStrainer("div", class_=has_class("search-post-list"))
+YOURSTORY_RESULTS = SoupStrainer("section", class_=has_class("container-results"))
+INC42_HITS = SoupStrainer("ol", class_=has_class("ais-Hits-list"))
+META_DESCRIPTION = SoupStrainer("meta", attrs={"name": "description"})
+
+_container_strainers = {}
+
+def make_soup(html, target=None):
+    """
+    Parse html with the configured backend. If target is a SoupStrainer, only the
+    matching elements (and their subtrees) are built.
+    """
+    return BeautifulSoup(html, PARSER_BACKEND, parse_only=target)
+
+def _container_strainer(tag, class_name):
+    key = (tag, class_name)
+    if key not in _container_strainers:
+        if class_name:
+            _container_strainers[key] = SoupStrainer(tag, class_=has_class(class_name))
+        else:
+            _container_strainers[key] = SoupStrainer(tag)
+    return _container_strainers[key]
+
+def extract_excerpt(html, tag, class_name=None):
+    """
+    Return the page's meta description, or else the text of the first <p> inside the
+    first <tag class="class_name"> container, or "".
+    """
+    if USE_SELECTOLAX:
+        tree = LexborHTMLParser(html)
+        meta = tree.css_first('meta[name="description"]')
+        if meta is not None:
+            content = meta.attributes.get("content")
+            if content:
+                return content.strip()
+        selector = f"{tag}.{class_name}" if class_name else tag
+        container = tree.css_first(selector)
+        if container is not None:
+            p_tag = container.css_first("p")
+            if p_tag is not None:
+                return p_tag.text(deep=True, separator="", strip=True)
+        return ""
+
+    meta_desc = make_soup(html, META_DESCRIPTION).find("meta")
+    if meta_desc and meta_desc.get("content"):
+        return meta_desc["content"].strip()
+    container = make_soup(html, _container_strainer(tag, class_name)).find(tag)
+    if container:
+        p_tag = container.find("p")
+        if p_tag:
+            return p_tag.get_text(strip=True)
+    return ""
+
+def html_to_text(fragment):
+    """
+    Plain text of an HTML fragment (e.g. an excerpt field from a JSON API), with
+    entities decoded and whitespace collapsed.
+    """
+    if not fragment:
+        return ""
+    return " ".join(BeautifulSoup(fragment, PARSER_BACKEND).get_text(" ").split())
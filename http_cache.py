@@ -0,0 +1,179 @@
+import os
+import sqlite3
+import threading
+import time
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+CACHE_PATH = "http_cache.sqlite"
+# Least recently used entries are evicted once the stored bodies exceed this.
+MAX_CACHE_BYTES = 512 * 1024 * 1024
+DEFAULT_TTL = 24 * 3600
+# Seconds a cached page counts as fresh, per source host. Stale entries are
+# revalidated with If-None-Match / If-Modified-Since before being refetched.
+SOURCE_TTLS = {
+    "techcrunch.com": 12 * 3600,
+    "factordaily.com": 7 * 24 * 3600,
+}
+
+def normalize_url(url):
+    """
+    Canonical cache key for a URL: lowercase scheme and host, no default port,
+    no fragment, and query parameters in sorted order.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and not ((scheme == "http" and parts.port == 80) or
+                           (scheme == "https" and parts.port == 443)):
+        host = f"{host}:{parts.port}"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, host, parts.path or "/", query, ""))
+
+def ttl_for(url):
+    """
+    Freshness lifetime for a URL, looked up by host (with or without "www.").
+    """
+    host = (urlsplit(url).hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    return SOURCE_TTLS.get(host, DEFAULT_TTL)
+
+class CachedPage:
+    """
+    A cached response body with the validators needed to revalidate it.
+    """
+
+    def __init__(self, url, status, body, encoding, etag, last_modified, fetched_at):
+        self.url = url
+        self.status = status
+        self.body = body
+        self.encoding = encoding
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = fetched_at
+
+    @property
+    def text(self):
+        return self.body.decode(self.encoding or "utf-8", errors="replace")
+
+    def is_fresh(self, ttl):
+        return time.time() - self.fetched_at < ttl
+
+    def conditional_headers(self):
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+class ResponseCache:
+    """
+    Persistent HTTP response cache stored in a single SQLite file.
+    Safe to share between threads; keeps hit/miss statistics for the process.
+    Set offline to serve any cached entry without touching the network.
+    """
+
+    def __init__(self, path=CACHE_PATH, max_bytes=MAX_CACHE_BYTES, offline=False):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, url TEXT, status INTEGER, body BLOB, encoding TEXT,"
+            " etag TEXT, last_modified TEXT, fetched_at REAL, accessed_at REAL, size INTEGER)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_lru ON responses (accessed_at)")
+        self._conn.commit()
+        self._total_bytes = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        self.stats = {"hits": 0, "misses": 0, "revalidated": 0, "stored": 0, "evicted": 0}
+
+    def lookup(self, url):
+        """
+        Return the CachedPage for a URL, or None. Marks the entry as recently used.
+        """
+        key = normalize_url(url)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT url, status, body, encoding, etag, last_modified, fetched_at"
+                " FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?",
+                               (time.time(), key))
+            self._conn.commit()
+        return CachedPage(*row)
+
+    def store(self, url, status, body, encoding=None, etag=None, last_modified=None):
+        """
+        Store a response body, evicting least recently used entries if over the size cap.
+        """
+        key = normalize_url(url)
+        now = time.time()
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            if old:
+                self._total_bytes -= old[0]
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, url, status, body, encoding, etag, last_modified, now, now, len(body)))
+            self._total_bytes += len(body)
+            self.stats["stored"] += 1
+            self._evict()
+            self._conn.commit()
+
+    def touch(self, url):
+        """
+        Mark a cached entry as freshly validated (after a 304 Not Modified).
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("UPDATE responses SET fetched_at = ?, accessed_at = ? WHERE key = ?",
+                               (now, now, normalize_url(url)))
+            self._conn.commit()
+            self.stats["revalidated"] += 1
+
+    def record_hit(self):
+        self.stats["hits"] += 1
+
+    def record_miss(self):
+        self.stats["misses"] += 1
+
+    def _evict(self):
+        if self._total_bytes <= self.max_bytes:
+            return
+        # Trim to 90% of the cap so eviction does not run on every store.
+        target = self.max_bytes * 0.9
+        rows = self._conn.execute("SELECT key, size FROM responses ORDER BY accessed_at").fetchall()
+        for key, size in rows:
+            if self._total_bytes <= target:
+                break
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._total_bytes -= size
+            self.stats["evicted"] += 1
+
+    def report(self):
+        """
+        Print cache statistics for this run.
+        """
+        lookups = self.stats["hits"] + self.stats["revalidated"] + self.stats["misses"]
+        served = self.stats["hits"] + self.stats["revalidated"]
+        rate = served / lookups * 100 if lookups else 0.0
+        print(f"HTTP cache: {self.stats['hits']} hits, {self.stats['revalidated']} revalidated, "
+              f"{self.stats['misses']} misses ({rate:.1f}% served from cache), "
+              f"{self.stats['evicted']} evicted, {self._total_bytes / 1024 / 1024:.1f} MiB stored")
+
+_cache = None
+
+def get_cache():
+    """
+    Return the process-wide cache, creating it on first use.
+    Setting SCRAPER_CACHE_OFFLINE=1 serves cached pages without revalidation.
+    """
+    global _cache
+    if _cache is None:
+        _cache = ResponseCache(offline=os.environ.get("SCRAPER_CACHE_OFFLINE") == "1")
+    return _cache
@@ -0,0 +1,126 @@
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from http_cache import get_cache, ttl_for
+from rate_limit import get_limiter, THROTTLED_STATUSES
+
+# Seconds before a connect or read is abandoned, for every scraper.
+DEFAULT_TIMEOUT = 30
+# Keep-alive connections kept open per host, and number of hosts pooled.
+POOL_MAXSIZE = 16
+POOL_CONNECTIONS = 8
+# Times a 429/503 is retried after the domain's Retry-After pause.
+RATE_LIMIT_RETRIES = 2
+
+USER_AGENT = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+              "AppleWebKit/537.36 (KHTML, like Gecko) "
+              "Chrome/91.0.4472.124 Safari/537.36")
+
+def _accept_encoding():
+    # urllib3 and aiohttp only decode brotli when a brotli module is installed,
+    # so only advertise it then.
+    try:
+        import brotli  # noqa: F401
+        return "gzip, deflate, br"
+    except ImportError:
+        try:
+            import brotlicffi  # noqa: F401
+            return "gzip, deflate, br"
+        except ImportError:
+            return "gzip, deflate"
+
+DEFAULT_HEADERS = {
+    "User-Agent": USER_AGENT,
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+    "Accept-Encoding": _accept_encoding(),
+}
+
+_session = None
+
+def create_session():
+    """
+    Create a requests session with pooled keep-alive connections and the default headers.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update(DEFAULT_HEADERS)
+    return session
+
+def get_session():
+    """
+    Return the process-wide shared session, creating it on first use.
+    """
+    global _session
+    if _session is None:
+        _session = create_session()
+    return _session
+
+def request(method, url, session=None, **kwargs):
+    """
+    Send a request under the per-domain rate limiter (see rate_limit), waiting out
+    and retrying 429/503 responses up to RATE_LIMIT_RETRIES times.
+    """
+    kwargs.setdefault("timeout", DEFAULT_TIMEOUT)
+    session = session or get_session()
+    limiter = get_limiter(url)
+    for attempt in range(RATE_LIMIT_RETRIES + 1):
+        with limiter.request() as report:
+            response = session.request(method, url, **kwargs)
+            report(response.status_code, response.headers.get("Retry-After"))
+        if response.status_code not in THROTTLED_STATUSES or attempt == RATE_LIMIT_RETRIES:
+            return response
+        print(f"Throttled on {url} (HTTP {response.status_code}), retrying after the pause")
+        response.close()
+
+def post(url, session=None, **kwargs):
+    """POST through the shared session (or the given one) under the rate limiter."""
+    return request("POST", url, session=session, **kwargs)
+
+def get(url, use_cache=True, session=None, **kwargs):
+    """
+    GET a URL through the shared session (or the given one, e.g. carrying login
+    cookies), applying the default timeout.
+    Accepts the same keyword arguments as requests.get; pass any query string as
+    part of the URL, since that is what the response cache is keyed on.
+
+    Unless use_cache is False (or stream=True), fresh cached pages are returned
+    without a request, stale ones are revalidated with their ETag/Last-Modified,
+    and 200 responses are stored.
+    """
+    kwargs.setdefault("timeout", DEFAULT_TIMEOUT)
+    session = session or get_session()
+    if not use_cache or kwargs.get("stream"):
+        return request("GET", url, session=session, **kwargs)
+
+    cache = get_cache()
+    cached = cache.lookup(url)
+    if cached and (cache.offline or cached.is_fresh(ttl_for(url))):
+        cache.record_hit()
+        return _response_from_cache(cached)
+    if cached:
+        kwargs["headers"] = dict(kwargs.get("headers") or {}, **cached.conditional_headers())
+
+    response = request("GET", url, session=session, **kwargs)
+    if cached and response.status_code == 304:
+        cache.touch(url)
+        return _response_from_cache(cached)
+    cache.record_miss()
+    if response.status_code == 200:
+        cache.store(url, response.status_code, response.content,
+                    encoding=response.encoding or response.apparent_encoding,
+                    etag=response.headers.get("ETag"),
+                    last_modified=response.headers.get("Last-Modified"))
+    return response
+
+def _response_from_cache(cached):
+    response = requests.Response()
+    response.status_code = cached.status
+    response.url = cached.url
+    response.encoding = cached.encoding
+    response.headers = CaseInsensitiveDict()
+    response._content = cached.body
+    return response
@@ -0,0 +1,75 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from requests.cookies import create_cookie
+
+import http_client
+from head_excerpt import stream_excerpt
+from retry_queue import is_transient
+from url_frontier import get_frontier
+
+# Article fetches in flight at once; matches the session's connection pool size.
+DEFAULT_WORKERS = http_client.POOL_MAXSIZE
+
+def _to_requests_cookie(cookie):
+    # Selenium cookie dicts use "expiry" and "httpOnly"; requests wants "expires" and rest.
+    return create_cookie(
+        cookie["name"], cookie["value"],
+        domain=cookie.get("domain", ""),
+        path=cookie.get("path", "/"),
+        secure=cookie.get("secure", False),
+        expires=cookie.get("expiry"),
+        rest={"HttpOnly": None} if cookie.get("httpOnly") else {},
+    )
+
+def cookie_session(cookies, user_agent=None):
+    """
+    A pooled requests session (see http_client) carrying browser cookies.
+    """
+    session = http_client.create_session()
+    if user_agent:
+        session.headers["User-Agent"] = user_agent
+    for cookie in cookies:
+        session.cookies.set_cookie(_to_requests_cookie(cookie))
+    return session
+
+class HybridFetcher:
+    """
+    Fetches article pages over plain pooled HTTP using the cookies (and User-Agent)
+    of a logged-in browser session, so the browser is only needed for search pages.
+    """
+
+    def __init__(self, cookies, user_agent=None, max_workers=DEFAULT_WORKERS):
+        self.session = cookie_session(cookies, user_agent)
+        self.max_workers = max_workers
+
+    @classmethod
+    def from_driver(cls, driver, **kwargs):
+        """
+        Copy the live driver's cookies and User-Agent (minus the "Headless" marker).
+        """
+        user_agent = driver.execute_script("return navigator.userAgent")
+        return cls(driver.get_cookies(), user_agent.replace("HeadlessChrome", "Chrome"), **kwargs)
+
+    def fetch_excerpt(self, url, parse_full, source):
+        """
+        Excerpt for one article (memoized in the URL frontier), or "" on a permanent
+        error. Transient errors are raised.
+        parse_full(html) is used when the page head has no meta description.
+        """
+        try:
+            return get_frontier().memoize(
+                url, lambda: stream_excerpt(url, parse_full, session=self.session), source=source)
+        except Exception as e:
+            if is_transient(e):
+                raise
+            print(f"Error fetching excerpt from {url}: {e}")
+            return ""
+
+    def fetch_excerpts(self, urls, parse_full, source):
+        """
+        Fetch excerpts for many articles concurrently. Returns {url: excerpt}.
+        """
+        urls = list(dict.fromkeys(urls))
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            excerpts = executor.map(lambda url: self.fetch_excerpt(url, parse_full, source), urls)
+            return dict(zip(urls, excerpts))
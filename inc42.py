@@ -1,157 +1,283 @@
-import os
 import time
-import pickle
 import json
-import random
 import csv
+import sys
 import undetected_chromedriver as uc
-from selenium.webdriver.common.by import By
-from bs4 import BeautifulSoup
 from urllib.parse import urlparse
 
-# Cookie file name.
-cookies_file = "cookies.pkl"
+import browser_daemon
+import browser_extract
+import browser_waits
+import inc42_search
+import lean_browser
+import rate_limit
+from browser_pool import BrowserPool, DEFAULT_POOL_SIZE
+from browser_waits import wait_for, wait_until_ready, any_present, count_stable
+from checkpoint_log import CheckpointLog
+from html_parsing import make_soup, extract_excerpt, INC42_HITS
+from hybrid_session import HybridFetcher
+from query_manifest import manifest_queries
+from retry_queue import is_transient
+from session_store import ensure_session, SITES
+from url_frontier import get_frontier
 
-def login_and_save_cookies():
+# Login cookies live in the per-site session store (sessions/inc42.pkl).
+SITE = "inc42"
+# Query the search index's JSON API for every manifest query instead of driving
+# the search page in browsers.
+SEARCH_API = True
+# Inc42 searches to run in browser mode, and the number of headless browsers.
+SEARCH_QUERIES = ["indians"]
+BROWSER_POOL_SIZE = DEFAULT_POOL_SIZE
+# Block images, media, fonts and trackers in the headless browsers.
+LEAN_MODE = True
+# Pull result fields out with in-page scripts instead of parsing page_source.
+EXTRACT_IN_BROWSER = True
+# Fetch article excerpts over plain HTTP with the browser's cookies; the browser
+# only loads search pages.
+HYBRID_EXCERPTS = True
+
+def login():
     options = uc.ChromeOptions()
     # Launch in non-headless mode for manual login.
     driver = uc.Chrome(options=options)
-    driver.get("https://inc42.com/login")
+    driver.get(SITES[SITE]["login_url"])
     print("Please log in manually within the next 40 seconds...")
     time.sleep(40)  # Adjust if necessary.
-    with open(cookies_file, "wb") as f:
-        pickle.dump(driver.get_cookies(), f)
-    print("Cookies saved successfully!")
+    cookies = driver.get_cookies()
     driver.quit()
+    return cookies
 
-# Force a new cookie file: remove if exists and perform manual login.
-if os.path.exists(cookies_file):
-    os.remove(cookies_file)
-login_and_save_cookies()
-
-def create_driver(headless=True):
+def create_driver(cookies, headless=True, lean=LEAN_MODE):
     options = uc.ChromeOptions()
     if headless:
         options.add_argument("--headless")
         options.add_argument("--disable-gpu")
     options.add_argument("--no-sandbox")
     options.add_argument("--disable-dev-shm-usage")
+    if lean:
+        lean_browser.configure_options(options)
     driver = uc.Chrome(options=options)
+    if lean:
+        lean_browser.enable_lean_mode(driver)
     driver.get("https://inc42.com")
-    time.sleep(1)  # Reduced sleep time.
-    
+    wait_until_ready(driver, "homepage load")
+    add_login_cookies(driver, cookies)
+    return driver
+
+def add_login_cookies(driver, cookies):
+    """
+    Load the stored login into a driver that is on the home page, then reload it.
+    Also used by browser_daemon.
+    """
     # Ensure cookies match the current domain.
     current_domain = urlparse(driver.current_url).netloc
-    with open(cookies_file, "rb") as f:
-        cookies = pickle.load(f)
-        for cookie in cookies:
-            # Skip cookies with an invalid domain.
-            if cookie.get("domain") == "new-tab-page":
-                continue
-            if "sameSite" in cookie:
-                cookie.pop("sameSite")
-            cookie["domain"] = current_domain
-            try:
-                driver.add_cookie(cookie)
-            except Exception as e:
-                print(f"Error adding cookie {cookie}: {e}")
+    for cookie in cookies:
+        # Skip cookies with an invalid domain.
+        if cookie.get("domain") == "new-tab-page":
+            continue
+        cookie = {key: value for key, value in cookie.items() if key != "sameSite"}
+        cookie["domain"] = current_domain
+        try:
+            driver.add_cookie(cookie)
+        except Exception as e:
+            print(f"Error adding cookie {cookie}: {e}")
     driver.refresh()
-    time.sleep(1)  # Reduced sleep time.
-    return driver
+    wait_until_ready(driver, "homepage reload")
+
+def driver_factory():
+    """
+    Attach to tabs of a running browser daemon (python browser_daemon.py inc42) when
+    there is one; otherwise launch browsers here with the stored login, which only
+    asks for a manual login when it no longer works.
+    """
+    if browser_daemon.running(SITE):
+        print("Attaching to the running browser daemon")
+        return lambda: browser_daemon.attach(SITE, lean=LEAN_MODE)
+    cookies = ensure_session(SITE, login)
+    return lambda: create_driver(cookies, headless=True)
 
 def get_excerpt(driver, url):
+    # Articles already read in this crawl generation come from the URL frontier.
     try:
-        driver.get(url)
-        # Very short sleep time for excerpt load.
-        time.sleep(random.uniform(0.5, 1))
-        article_soup = BeautifulSoup(driver.page_source, "html.parser")
-        meta_desc = article_soup.find("meta", {"name": "description"})
-        if meta_desc and meta_desc.get("content"):
-            return meta_desc["content"].strip()
-        # Fallback: get the first paragraph from the post content.
-        article_body = article_soup.find("div", class_="post-content")
-        if article_body:
-            p_tag = article_body.find("p")
-            if p_tag:
-                return p_tag.get_text(strip=True)
-        return ""
+        return get_frontier().memoize(url, lambda: _read_excerpt(driver, url), source="inc42")
     except Exception as e:
+        if is_transient(e):
+            raise
         print(f"Error fetching excerpt from {url}: {e}")
         return ""
 
-def main():
-    driver = create_driver(headless=True)
-    
-    # Navigate to the search URL.
-    search_url = "https://inc42.com/?s=indians#inc-search-popup"
-    driver.get(search_url)
-    time.sleep(1)  # Minimal sleep time for results to load.
-    
-    soup = BeautifulSoup(driver.page_source, "html.parser")
-    base_url = "https://inc42.com"
-    results = []
+def parse_article_excerpt(html):
+    # Meta description, falling back to the first paragraph of the post content.
+    return extract_excerpt(html, "div", "post-content")
+
+def _read_excerpt(driver, url):
+    rate_limit.browser_get(driver, url)
+    wait_for(driver, any_present('meta[name="description"]', "div.post-content p"), "article excerpt")
+    lean_browser.record_page(driver, url)
+    if EXTRACT_IN_BROWSER:
+        return browser_extract.excerpt(driver, "div.post-content")
+    return parse_article_excerpt(driver.page_source)
+
+def parse_inc42_hits(html):
+    """
+    Parse search page HTML into [{title, link, date, category}] (None for missing
+    fields), or None when there is no hit list.
+    """
+    soup = make_soup(html, INC42_HITS)
     
     # Locate the search results container.
     hits_list = soup.find("ol", class_="ais-Hits-list")
-    if hits_list:
-        hit_items = hits_list.find_all("li", class_="ais-Hits-item")
-        for item in hit_items:
-            content_div = item.find("div", class_="ais-hits--content")
-            if not content_div:
-                continue
-            h2 = content_div.find("h2", class_="entry-title")
-            if not h2:
-                continue
-            a_tag = h2.find("a")
-            title = a_tag.get_text(strip=True) if a_tag else "N/A"
-            link = a_tag["href"] if a_tag and a_tag.has_attr("href") else "N/A"
-            if link != "N/A" and link.startswith("/"):
-                link = base_url + link
-
-            # Extract the date from meta-wrapper.
-            date = "N/A"
-            meta_div = content_div.find("div", class_="meta-wrapper")
-            if meta_div:
-                span_date = meta_div.find("span", class_="date")
-                if span_date:
-                    date = span_date.get_text(strip=True)
-            
-            # Set a default category and refine based on URL.
-            category = "Stories"
-            if link != "N/A":
-                if "/buzz/" in link:
-                    category = "Buzz"
-                elif "/features/" in link:
-                    category = "Features"
-                elif "/startups/" in link:
-                    category = "Startups"
-            
-            excerpt = get_excerpt(driver, link) if link != "N/A" else ""
-            
-            result_item = {
-                "title": title,
-                "link": link,
-                "date": date,
-                "category": category,
-                "excerpt": excerpt
-            }
-            results.append(result_item)
+    if not hits_list:
+        return None
+    hits = []
+    for item in hits_list.find_all("li", class_="ais-Hits-item"):
+        content_div = item.find("div", class_="ais-hits--content")
+        if not content_div:
+            continue
+        h2 = content_div.find("h2", class_="entry-title")
+        if not h2:
+            continue
+        a_tag = h2.find("a")
+        title = a_tag.get_text(strip=True) if a_tag else None
+        link = a_tag["href"] if a_tag and a_tag.has_attr("href") else None
+
+        # Extract the date from meta-wrapper.
+        date = None
+        meta_div = content_div.find("div", class_="meta-wrapper")
+        if meta_div:
+            span_date = meta_div.find("span", class_="date")
+            if span_date:
+                date = span_date.get_text(strip=True)
+        hits.append({"title": title, "link": link, "date": date, "category": None})
+    return hits
+
+def search_inc42(driver, query):
+    """
+    Scrape the Inc42 search results for a query. The "excerpt" field is left empty;
+    main fills it in from the article pages.
+    """
+    # Navigate to the search URL.
+    search_url = f"https://inc42.com/?s={query}#inc-search-popup"
+    rate_limit.browser_get(driver, search_url)
+    # Algolia renders hits client-side: wait until the hit list stops growing.
+    wait_for(driver, count_stable("ol.ais-Hits-list li.ais-Hits-item"), "search hits")
+    lean_browser.record_page(driver, search_url)
+
+    if EXTRACT_IN_BROWSER:
+        hits = browser_extract.inc42_hits(driver)
     else:
-        print("No search results found.")
+        hits = parse_inc42_hits(driver.page_source)
+    if hits is None:
+        print(f"No search results found for query: {query}")
+        return []
+
+    base_url = "https://inc42.com"
+    results = []
+    for hit in hits:
+        title = hit["title"] if hit["title"] is not None else "N/A"
+        link = hit["link"] if hit["link"] is not None else "N/A"
+        if link != "N/A" and link.startswith("/"):
+            link = base_url + link
+        date = hit["date"] if hit["date"] is not None else "N/A"
+        category = inc42_search.category_for(link)
+
+        result_item = {
+            "title": title,
+            "link": link,
+            "date": date,
+            "category": category,
+            "excerpt": ""
+        }
+        results.append(result_item)
+    return results
+
+# API mode: one line per finished query, compacted into the same flat list of
+# records (each with its query) that the browser mode writes.
+checkpoint = CheckpointLog("inc42_results.jsonl", "inc42_results.json", shape="records")
+CSV_FIELDS = ["query", "title", "link", "date", "category", "excerpt"]
+
+def write_csv(rows):
+    with open("inc42.csv", "w", newline='', encoding="utf-8") as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+def main_api(fresh=False):
+    """
+    Search every manifest query through the search index API, in batched
+    multi-query requests; excerpts come with the hits. Resumable like the other
+    scrapers (--fresh starts over).
+    """
+    queries = manifest_queries()
+    print(f"Total unique queries to search: {len(queries)}")
+    queries = checkpoint.resume(queries, fresh=fresh)
+    record_count = 0
+
+    def handle_result(query, records, error):
+        nonlocal record_count
+        if error is not None:
+            print(f"Error searching Inc42 for '{query}': {error}")
+            checkpoint.append(query, [], status="error", error=error)
+            return
+        record_count += len(records)
+        checkpoint.append(query, records)
+
+    inc42_search.search_many(queries, on_result=handle_result)
+    checkpoint.compact()
+    checkpoint.close()
+    print(f"Inc42 search completed. Records found this run: {record_count}")
+    rate_limit.report()
+
+    with open(checkpoint.output_path, "r", encoding="utf-8") as f:
+        write_csv(json.load(f))
+
+def main(fresh=False):
+    if SEARCH_API:
+        main_api(fresh=fresh)
+        return
+    hits = {}
+    excerpts = {}
+
+    def collect_hits(query, items, error):
+        if error is not None:
+            print(f"Error searching Inc42 for '{query}': {error}")
+        hits[query] = items or []
+
+    def collect_excerpt(link, excerpt, error):
+        excerpts[link] = excerpt or ""
+
+    # Searches, then article excerpts, are spread over the same pool of browsers.
+    with BrowserPool(driver_factory(), size=BROWSER_POOL_SIZE) as pool:
+        pool.run(SEARCH_QUERIES, search_inc42, on_result=collect_hits)
+        results = [dict(item, query=query) for query in SEARCH_QUERIES for item in hits.get(query, [])]
+        links = list(dict.fromkeys(item["link"] for item in results if item["link"] != "N/A"))
+        if HYBRID_EXCERPTS:
+            # Articles go over plain HTTP with a logged-in browser's cookies.
+            live = next((driver for driver in pool.drivers if driver is not None), None)
+            if live is not None:
+                fetcher = HybridFetcher.from_driver(live)
+            else:
+                fetcher = HybridFetcher(ensure_session(SITE, login))
+            excerpts = fetcher.fetch_excerpts(links, parse_article_excerpt, "inc42")
+        else:
+            pool.run(links, get_excerpt, on_result=collect_excerpt)
+
+    for item in results:
+        item["excerpt"] = excerpts.get(item["link"], "")
     
     # Save the scraped results to a JSON file.
     with open("inc42_results.json", "w", encoding="utf-8") as f:
         json.dump(results, f, indent=4)
     
     # Save the scraped results to a CSV file.
-    with open("inc42.csv", "w", newline='', encoding="utf-8") as csvfile:
-        fieldnames = ["title", "link", "date", "category", "excerpt"]
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(results)
+    write_csv(results)
     
     print(json.dumps(results, indent=4))
-    driver.quit()
+    get_frontier().report()
+    browser_waits.report()
+    lean_browser.report()
+    rate_limit.report()
 
 if __name__ == "__main__":
-    main()
+    main(fresh="--fresh" in sys.argv)
@@ -0,0 +1,124 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlencode
+
+import http_client
+from html_parsing import html_to_text
+
+# The Inc42 search page is WP Search with Algolia, which prints its client config
+# (application id, search-only key, index names) into the page as `var algolia = {...}`.
+SEARCH_PAGE_URL = "https://inc42.com/?s=startup"
+CONFIG_MARKER = "var algolia = "
+# Queries sent per multi-query request, and batch requests in flight at once.
+BATCH_SIZE = 50
+DEFAULT_WORKERS = 8
+HITS_PER_QUERY = 20
+# Only the fields mapped into our records are returned.
+ATTRIBUTES = ["post_title", "permalink", "post_date_formatted", "post_excerpt"]
+
+_config = None
+
+def discover_config(html):
+    """
+    Application id, search key and posts index name from the search page HTML,
+    or None if the page does not carry the Algolia config.
+    """
+    start = html.find(CONFIG_MARKER)
+    if start == -1:
+        return None
+    try:
+        config, _ = json.JSONDecoder().raw_decode(html, start + len(CONFIG_MARKER))
+    except ValueError:
+        return None
+    indices = config.get("indices", {})
+    index = indices.get("searchable_posts") or next(iter(indices.values()), {})
+    return {"app_id": config.get("application_id"),
+            "api_key": config.get("search_api_key"),
+            "index": index.get("name")}
+
+def algolia_config():
+    """
+    Connection settings for the search index. INC42_ALGOLIA_APP_ID, _API_KEY, _INDEX
+    and _URL override them (e.g. to point at fake_endpoints); anything not set is
+    read from the live search page once.
+    """
+    global _config
+    if _config is None:
+        config = {"app_id": os.environ.get("INC42_ALGOLIA_APP_ID"),
+                  "api_key": os.environ.get("INC42_ALGOLIA_API_KEY"),
+                  "index": os.environ.get("INC42_ALGOLIA_INDEX")}
+        if not all(config.values()):
+            discovered = discover_config(http_client.get(SEARCH_PAGE_URL).text)
+            if not discovered:
+                raise RuntimeError("Algolia config not found on the Inc42 search page")
+            config = {key: value or discovered[key] for key, value in config.items()}
+        config["url"] = (os.environ.get("INC42_ALGOLIA_URL")
+                         or f"https://{config['app_id']}-dsn.algolia.net")
+        _config = config
+    return _config
+
+def category_for(link):
+    """Inc42 section from the article URL, defaulting to "Stories"."""
+    if "/buzz/" in link:
+        return "Buzz"
+    if "/features/" in link:
+        return "Features"
+    if "/startups/" in link:
+        return "Startups"
+    return "Stories"
+
+def hit_to_record(hit):
+    """Map one index hit to the {title, link, date, category, excerpt} record."""
+    link = hit.get("permalink") or "N/A"
+    return {
+        "title": hit.get("post_title") or "N/A",
+        "link": link,
+        "date": hit.get("post_date_formatted") or "N/A",
+        "category": category_for(link),
+        "excerpt": html_to_text(hit.get("post_excerpt")),
+    }
+
+def search_batch(queries, session=None):
+    """
+    Run up to BATCH_SIZE queries in one multi-query request. Returns a list of
+    record lists in the same order as queries. Raises on HTTP errors.
+    """
+    config = algolia_config()
+    params = {"hitsPerPage": HITS_PER_QUERY,
+              "attributesToRetrieve": json.dumps(ATTRIBUTES),
+              "attributesToHighlight": "[]",
+              "attributesToSnippet": "[]"}
+    body = {"requests": [{"indexName": config["index"],
+                          "params": urlencode(dict(params, query=query))}
+                         for query in queries]}
+    response = http_client.post(f"{config['url']}/1/indexes/*/queries", session=session, json=body,
+                                headers={"X-Algolia-Application-Id": config["app_id"],
+                                         "X-Algolia-API-Key": config["api_key"]})
+    response.raise_for_status()
+    return [[hit_to_record(hit) for hit in result.get("hits", [])]
+            for result in response.json()["results"]]
+
+def search_many(queries, on_result=None, batch_size=BATCH_SIZE, workers=DEFAULT_WORKERS):
+    """
+    Search every query, batch_size per request with several requests in flight.
+    on_result(query, records, error) is called from this thread as each batch
+    finishes. Returns {query: records} for the queries that succeeded.
+    """
+    queries = list(queries)
+    batches = [queries[i:i + batch_size] for i in range(0, len(queries), batch_size)]
+    results = {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(search_batch, batch): batch for batch in batches}
+        for future in as_completed(futures):
+            batch = futures[future]
+            try:
+                records, error = future.result(), None
+            except Exception as e:
+                records, error = [None] * len(batch), e
+            for query, query_records in zip(batch, records):
+                if error is None:
+                    results[query] = query_records
+                if on_result:
+                    on_result(query, query_records, error)
+    return results
@@ -0,0 +1,100 @@
+import json
+import threading
+
+# Requests matching these patterns are blocked through DevTools in lean mode. We only
+# read text from page_source, so images, media, fonts and trackers are dead weight.
+BLOCKED_URL_PATTERNS = [
+    # Images
+    "*.png*", "*.jpg*", "*.jpeg*", "*.gif*", "*.webp*", "*.avif*", "*.svg*", "*.ico*",
+    # Audio / video
+    "*.mp4*", "*.webm*", "*.m3u8*", "*.mp3*",
+    # Fonts
+    "*.woff*", "*.woff2*", "*.ttf*", "*.otf*", "*.eot*",
+    # Ads, analytics and third-party trackers
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*googlesyndication.com*", "*adservice.google.*", "*facebook.net*", "*connect.facebook.*",
+    "*hotjar.com*", "*clarity.ms*", "*scorecardresearch.com*", "*taboola.com*",
+    "*outbrain.com*", "*amazon-adsystem.com*", "*criteo.*", "*segment.io*",
+    "*mixpanel.com*", "*newrelic.com*", "*nr-data.net*", "*youtube.com/embed*",
+]
+
+# Rough transfer size of a blocked request by resource type, used to estimate the
+# bytes saved (the real size of a request that never happens is unknown).
+ESTIMATED_BYTES_BY_TYPE = {
+    "Image": 40_000,
+    "Media": 500_000,
+    "Font": 30_000,
+    "Script": 25_000,
+    "Stylesheet": 15_000,
+}
+DEFAULT_ESTIMATED_BYTES = 10_000
+
+_totals_lock = threading.Lock()
+totals = {"pages": 0, "blocked": 0, "bytes_loaded": 0, "bytes_saved_estimate": 0}
+
+def configure_options(options):
+    """
+    Add lean-mode settings to ChromeOptions before the driver is created: images off
+    at the renderer level and performance logging for the byte accounting.
+    """
+    options.add_argument("--blink-settings=imagesEnabled=false")
+    options.add_argument("--mute-audio")
+    options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+    options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+
+def enable_lean_mode(driver, extra_patterns=()):
+    """
+    Block the default patterns plus extra_patterns for every following page load.
+    """
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs",
+                           {"urls": BLOCKED_URL_PATTERNS + list(extra_patterns)})
+    driver.lean_mode = True
+
+def record_page(driver, url):
+    """
+    Summarize requests since the last call from the driver's performance log:
+    requests blocked, bytes actually loaded, and an estimate of the bytes saved.
+    Does nothing for drivers not in lean mode.
+    """
+    if not getattr(driver, "lean_mode", False):
+        return None
+    try:
+        entries = driver.get_log("performance")
+    except Exception as e:
+        print(f"Could not read performance log: {e}")
+        return None
+
+    types = {}
+    page = {"blocked": 0, "bytes_loaded": 0, "bytes_saved_estimate": 0}
+    for entry in entries:
+        message = json.loads(entry["message"])["message"]
+        method, params = message.get("method"), message.get("params", {})
+        if method == "Network.requestWillBeSent":
+            types[params.get("requestId")] = params.get("type")
+        elif method == "Network.loadingFinished":
+            page["bytes_loaded"] += int(params.get("encodedDataLength", 0))
+        elif method == "Network.loadingFailed" and params.get("blockedReason"):
+            resource_type = params.get("type") or types.get(params.get("requestId"))
+            page["blocked"] += 1
+            page["bytes_saved_estimate"] += ESTIMATED_BYTES_BY_TYPE.get(
+                resource_type, DEFAULT_ESTIMATED_BYTES)
+
+    with _totals_lock:
+        totals["pages"] += 1
+        for key, value in page.items():
+            totals[key] += value
+    print(f"Lean mode {url}: {page['blocked']} requests blocked, "
+          f"~{page['bytes_saved_estimate'] / 1024:.0f} KiB saved, "
+          f"{page['bytes_loaded'] / 1024:.0f} KiB loaded")
+    return page
+
+def report():
+    """
+    Print lean-mode totals for this run.
+    """
+    if not totals["pages"]:
+        return
+    print(f"Lean mode: {totals['pages']} pages, {totals['blocked']} requests blocked, "
+          f"~{totals['bytes_saved_estimate'] / 1024 / 1024:.1f} MiB saved, "
+          f"{totals['bytes_loaded'] / 1024 / 1024:.1f} MiB loaded")
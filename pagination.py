@@ -0,0 +1,104 @@
+import asyncio
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+# Deepest result page read for a query, and pages fetched at once after page 1.
+DEFAULT_MAX_PAGES = 5
+DEFAULT_WINDOW = 2
+
+# Page depth used per query in this run, and how often each depth occurred.
+depths = {}
+_depth_counts = Counter()
+_lock = threading.Lock()
+
+def _link(record):
+    return record.get("link")
+
+class _Pager:
+    """
+    Merges pages in order and decides when to stop: after a page without new links
+    or (if relevant is given) without a relevant record, or after a page 1 that is
+    not full.
+    """
+
+    def __init__(self, page_size, relevant, key):
+        self.page_size = page_size
+        self.relevant = relevant
+        self.key = key
+        self.records = []
+        self.seen = set()
+        self.depth = 0
+
+    def add(self, page, records):
+        """Merge one page. Returns False once no further pages should be read."""
+        if not records:
+            return False
+        new = [record for record in records if self.key(record) not in self.seen]
+        if page > 1 and not new:
+            return False
+        self.depth = page
+        for record in new:
+            self.seen.add(self.key(record))
+            self.records.append(record)
+        if self.relevant and not any(self.relevant(record) for record in new):
+            return False
+        if page == 1 and self.page_size and len(records) < self.page_size:
+            return False
+        return True
+
+def _record_depth(query, depth):
+    with _lock:
+        depths[query] = depth
+        _depth_counts[depth] += 1
+
+def paginate(fetch_page, query, max_pages=DEFAULT_MAX_PAGES, page_size=None,
+             relevant=None, window=DEFAULT_WINDOW, key=_link):
+    """
+    Read result pages for query with fetch_page(page) -> records. Page 1 is read
+    first; if it is full (page_size records; any non-empty page when page_size is
+    None), pages 2..max_pages are fetched window at a time in parallel and merged in
+    order until a page brings no new links or no record passing relevant(record).
+    Returns (records, depth) where depth is the last page whose records were used.
+    """
+    pager = _Pager(page_size, relevant, key)
+    more = pager.add(1, fetch_page(1))
+    page = 2
+    with ThreadPoolExecutor(max_workers=max(1, window)) as executor:
+        while more and page <= max_pages:
+            pages = list(range(page, min(page + window, max_pages + 1)))
+            for number, records in zip(pages, executor.map(fetch_page, pages)):
+                more = pager.add(number, records)
+                if not more:
+                    break
+            page += len(pages)
+    _record_depth(query, pager.depth)
+    return pager.records, pager.depth
+
+async def paginate_async(fetch_page, query, max_pages=DEFAULT_MAX_PAGES, page_size=None,
+                         relevant=None, window=DEFAULT_WINDOW, key=_link):
+    """
+    Async counterpart of paginate; fetch_page(page) is a coroutine function.
+    """
+    pager = _Pager(page_size, relevant, key)
+    more = pager.add(1, await fetch_page(1))
+    page = 2
+    while more and page <= max_pages:
+        pages = list(range(page, min(page + window, max_pages + 1)))
+        for number, records in zip(pages, await asyncio.gather(*(fetch_page(p) for p in pages))):
+            more = pager.add(number, records)
+            if not more:
+                break
+        page += len(pages)
+    _record_depth(query, pager.depth)
+    return pager.records, pager.depth
+
+def report():
+    """
+    Print how many queries stopped at each page depth in this run.
+    """
+    if not depths:
+        return
+    histogram = ", ".join(f"{depth}: {count}" for depth, count in sorted(_depth_counts.items()))
+    print(f"Pagination: {len(depths)} queries, {sum(depths.values())} pages used "
+          f"(queries per depth: {histogram})")
@@ -0,0 +1,132 @@
+import ast
+import hashlib
+import html
+import json
+import os
+import pickle
+import re
+import unicodedata
+
+FOUNDERS_COMPANIES_PATH = "founders_companies.json"
+MANIFEST_CACHE_PATH = "query_manifest.pkl"
+# Bump when the normalization rules change so cached manifests are rebuilt.
+MANIFEST_VERSION = 2
+
+_WHITESPACE = re.compile(r"\s+")
+_EDGE_PUNCTUATION = " \t\"'`,;:|[]{}"
+_LEGAL_SUFFIX = re.compile(
+    r"[\s,]+(pvt\.?\s*ltd\.?|private\s+limited|ltd\.?|limited|inc\.?|llp|llc|corp\.?)$",
+    re.IGNORECASE)
+
+def clean_text(text):
+    """
+    Unicode-normalize (NFKC) a name, decode HTML entities left over from the
+    scraped CSV ("&amp;") and collapse runs of whitespace.
+    """
+    text = unicodedata.normalize("NFKC", html.unescape(str(text)))
+    return _WHITESPACE.sub(" ", text).strip().strip(_EDGE_PUNCTUATION).strip()
+
+def fold_key(text, kind="founder"):
+    """
+    Key under which spellings of the same entity are merged: case-folded, accents
+    removed, and for companies legal suffixes such as "Pvt Ltd" dropped.
+    """
+    text = clean_text(text)
+    if kind == "company":
+        text = _LEGAL_SUFFIX.sub("", text)
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return clean_text(stripped).casefold()
+
+def parse_founders(field):
+    """
+    Split a Founders field into names. Handles the "['A', 'B']" list form as well as
+    plain comma-separated strings.
+    """
+    if field is None:
+        return []
+    if isinstance(field, list):
+        return [str(name) for name in field if name]
+    field = str(field).strip()
+    if field.startswith("[") and field.endswith("]"):
+        try:
+            founders = ast.literal_eval(field)
+            if isinstance(founders, list):
+                return [str(name) for name in founders if name]
+            return [str(founders)]
+        except Exception as e:
+            print(f"Error parsing founders entry: {field}. Error: {e}")
+            field = field.strip("[]")
+    return [name for name in field.split(",") if name.strip()]
+
+def _query_id(key):
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:12]
+
+def build_manifest(records):
+    """
+    Build the canonical query list from founders/companies records.
+
+    Each query is {"id", "text", "key", "kinds", "companies"}: a stable id derived
+    from the folded key, the display text (first spelling seen), whether it names a
+    company and/or a founder, and the companies it is linked to. Sorted by key.
+    """
+    queries = {}
+
+    def add(name, kind, company):
+        text = clean_text(name)
+        if not text:
+            return
+        key = fold_key(text, kind)
+        if not key:
+            return
+        query = queries.get(key)
+        if query is None:
+            query = queries[key] = {"id": _query_id(key), "text": text, "key": key,
+                                    "kinds": [], "companies": []}
+        if kind not in query["kinds"]:
+            query["kinds"].append(kind)
+        if company and company not in query["companies"]:
+            query["companies"].append(company)
+
+    for record in records:
+        company = clean_text(record.get("Company") or "")
+        if company:
+            add(company, "company", company)
+        for founder in parse_founders(record.get("Founders")):
+            add(founder, "founder", company)
+
+    return [queries[key] for key in sorted(queries)]
+
+def load_manifest(path=FOUNDERS_COMPANIES_PATH, cache_path=MANIFEST_CACHE_PATH):
+    """
+    Return the query manifest for path, reusing the cached copy in cache_path
+    unless the input file's contents have changed.
+    """
+    with open(path, "rb") as f:
+        raw = f.read()
+    digest = hashlib.sha256(raw).hexdigest()
+
+    if os.path.exists(cache_path):
+        try:
+            with open(cache_path, "rb") as f:
+                cached = pickle.load(f)
+            if cached.get("version") == MANIFEST_VERSION and cached.get("digest") == digest:
+                return cached["queries"]
+        except Exception as e:
+            print(f"Ignoring unreadable manifest cache {cache_path}: {e}")
+
+    queries = build_manifest(json.loads(raw.decode("utf-8")))
+    try:
+        with open(cache_path, "wb") as f:
+            pickle.dump({"version": MANIFEST_VERSION, "digest": digest, "queries": queries},
+                        f, protocol=pickle.HIGHEST_PROTOCOL)
+    except Exception as e:
+        print(f"Error saving manifest cache {cache_path}: {e}")
+    print(f"Built query manifest from {path}: {len(queries)} unique queries")
+    return queries
+
+def manifest_queries(path=FOUNDERS_COMPANIES_PATH):
+    """
+    The display text of every manifest query, in manifest order.
+    """
+    return [query["text"] for query in load_manifest(path)]
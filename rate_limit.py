@@ -0,0 +1,216 @@
+import asyncio
+import threading
+import time
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+# Starting request rate (per second), burst size and parallel requests per domain.
+# The controller then adapts rate and concurrency to what each site tolerates.
+DEFAULT_RATE = 4.0
+DEFAULT_BURST = 8
+DEFAULT_CONCURRENCY = 8
+MIN_RATE = 0.2
+MAX_RATE = 50.0
+MAX_CONCURRENCY = 32
+# Per-domain overrides of the starting settings.
+DOMAIN_SETTINGS = {
+    "techcrunch.com": {"rate": 8.0},
+    "factordaily.com": {"rate": 2.0, "concurrency": 4},
+    # Reddit allows 100 requests a minute; reddit_search paces by its headers.
+    "oauth.reddit.com": {"rate": 1.6, "concurrency": 4},
+}
+# AIMD: add ADDITIVE_RATE per success, multiply by BACKOFF_FACTOR on a 429/5xx or
+# when the recent latency has stayed above LATENCY_FACTOR times the baseline for
+# SLOW_STREAK successes in a row, at most once per BACKOFF_INTERVAL seconds.
+ADDITIVE_RATE = 0.1
+BACKOFF_FACTOR = 0.5
+LATENCY_FACTOR = 3.0
+SLOW_STREAK = 10
+BACKOFF_INTERVAL = 2.0
+# Recent latency follows each response closely; the baseline drifts slowly, so one
+# unusually fast response (a 304, a head-only read) barely moves it.
+LATENCY_SMOOTHING = 0.2
+BASELINE_SMOOTHING = 0.02
+# Used when a 429/503 comes without a usable Retry-After.
+DEFAULT_RETRY_AFTER = 5.0
+THROTTLED_STATUSES = (429, 503)
+# Poll interval while waiting for a concurrency slot.
+SLOT_POLL = 0.05
+
+def parse_retry_after(value):
+    """Seconds to wait from a Retry-After header (seconds or HTTP date), or None."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+class DomainLimiter:
+    """
+    Token bucket plus an adaptive cap on requests in flight for one domain.
+    Callers wait for a token and a slot, then report the status and latency of the
+    request, which drives the AIMD adjustment and Retry-After pauses.
+    """
+
+    def __init__(self, domain, rate=DEFAULT_RATE, burst=DEFAULT_BURST,
+                 concurrency=DEFAULT_CONCURRENCY):
+        self.domain = domain
+        self.rate = rate
+        self.burst = burst
+        self.concurrency = concurrency
+        self.tokens = float(burst)
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self.latency = None
+        self.baseline_latency = None
+        self._slow = 0
+        self.last_backoff = 0.0
+        self._updated = time.monotonic()
+        self._successes = 0
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "waited": 0.0, "throttled": 0, "errors": 0}
+
+    def _try_acquire(self):
+        # Take a token and a slot if both are free; otherwise return seconds to wait.
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if now < self.paused_until:
+                return self.paused_until - now
+            if self.in_flight >= self.concurrency:
+                return SLOT_POLL
+            if self.tokens < 1:
+                return (1 - self.tokens) / self.rate
+            self.tokens -= 1
+            self.in_flight += 1
+            self.stats["requests"] += 1
+            return 0
+
+    def acquire(self):
+        """Block until a request may be sent."""
+        while True:
+            wait = self._try_acquire()
+            if not wait:
+                return
+            self.stats["waited"] += wait
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        """Async counterpart of acquire."""
+        while True:
+            wait = self._try_acquire()
+            if not wait:
+                return
+            self.stats["waited"] += wait
+            await asyncio.sleep(wait)
+
+    def release(self, status, latency, retry_after=None):
+        """
+        Report a finished request: status is the HTTP status (None for a network
+        error) and retry_after the raw Retry-After header, if any.
+        """
+        with self._lock:
+            self.in_flight -= 1
+            now = time.monotonic()
+            if status in THROTTLED_STATUSES:
+                self.stats["throttled"] += 1
+                pause = parse_retry_after(retry_after)
+                self.paused_until = max(self.paused_until,
+                                        now + (pause if pause is not None else DEFAULT_RETRY_AFTER))
+                self._back_off(now)
+            elif status is None or status >= 500:
+                self.stats["errors"] += 1
+                self._back_off(now)
+            else:
+                if self.latency is None:
+                    self.latency = self.baseline_latency = latency
+                else:
+                    self.latency += LATENCY_SMOOTHING * (latency - self.latency)
+                    self.baseline_latency += BASELINE_SMOOTHING * (latency - self.baseline_latency)
+                if self.latency > LATENCY_FACTOR * self.baseline_latency:
+                    self._slow += 1
+                else:
+                    self._slow = 0
+                if self._slow >= SLOW_STREAK:
+                    self._back_off(now)
+                else:
+                    self._speed_up()
+
+    def _back_off(self, now):
+        if now - self.last_backoff < BACKOFF_INTERVAL:
+            return
+        self.last_backoff = now
+        self.rate = max(MIN_RATE, self.rate * BACKOFF_FACTOR)
+        self.concurrency = max(1, int(self.concurrency * BACKOFF_FACTOR))
+        self._successes = 0
+        self._slow = 0
+        print(f"Rate limit {self.domain}: backing off to {self.rate:.1f} req/s, "
+              f"{self.concurrency} in flight")
+
+    def _speed_up(self):
+        self.rate = min(MAX_RATE, self.rate + ADDITIVE_RATE)
+        self._successes += 1
+        # One more request in flight per window of successful requests.
+        if self._successes >= self.concurrency and self.concurrency < MAX_CONCURRENCY:
+            self.concurrency += 1
+            self._successes = 0
+
+    @contextmanager
+    def request(self):
+        """
+        Hold a token and slot around one request; call the yielded report(status,
+        retry_after=None) with the outcome. Exceptions count as network errors.
+        """
+        self.acquire()
+        outcome = {"status": None, "retry_after": None}
+        started = time.monotonic()
+
+        def report(status, retry_after=None):
+            outcome.update(status=status, retry_after=retry_after)
+
+        try:
+            yield report
+        finally:
+            self.release(outcome["status"], time.monotonic() - started, outcome["retry_after"])
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+def domain_of(url):
+    host = urlparse(url).hostname or ""
+    return host[4:] if host.startswith("www.") else host
+
+def get_limiter(url):
+    """The shared limiter for url's domain, created on first use."""
+    domain = domain_of(url)
+    with _limiters_lock:
+        if domain not in _limiters:
+            _limiters[domain] = DomainLimiter(domain, **DOMAIN_SETTINGS.get(domain, {}))
+        return _limiters[domain]
+
+def browser_get(driver, url):
+    """
+    driver.get(url) under the domain's limiter. The browser does not expose the
+    status, so only latency and exceptions feed the adjustment.
+    """
+    with get_limiter(url).request() as report:
+        driver.get(url)
+        report(200)
+
+def report():
+    """
+    Print per-domain request counts, time spent waiting, and the settled rates.
+    """
+    for domain, limiter in sorted(_limiters.items()):
+        stats = limiter.stats
+        print(f"Rate limit {domain}: {stats['requests']} requests, "
+              f"{stats['throttled']} throttled, {stats['errors']} errors, "
+              f"{stats['waited']:.1f}s waited (summed over workers); now {limiter.rate:.1f} req/s, "
+              f"{limiter.concurrency} in flight")
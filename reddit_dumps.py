@@ -0,0 +1,217 @@
+import bz2
+import gzip
+import heapq
+import io
+import json
+import os
+import sys
+import time
+from collections import deque
+from multiprocessing import Pool, cpu_count
+
+from entity_matcher import EntityMatcher
+from query_manifest import fold_key, load_manifest
+
+# Offline alternative to reddit_scraping.py: stream newline-delimited submission
+# dumps (.zst, .gz, .bz2 or plain) from disk and match every title and selftext
+# against the whole query manifest on all cores. Run it as
+# `python reddit_dumps.py RS_2023-01.zst [more dumps...] [--workers N]`.
+OUTPUT_PATH = "reddit_dump_data.json"
+# Lines handed to a worker at a time, and chunks queued per worker.
+CHUNK_LINES = 20000
+CHUNKS_PER_WORKER = 2
+# Highest-scoring submissions kept per query.
+MAX_RESULTS = 50
+# Founder names alone match namesakes (athletes, actors...); only count a founder
+# when the same submission also names one of their companies.
+FOUNDER_NEEDS_COMPANY = True
+# Pushshift-style dumps are compressed with a long window.
+ZSTD_MAX_WINDOW = 2 ** 31
+
+def open_dump(path):
+    """Open a dump as text, decompressing by file extension."""
+    if path.endswith(".zst"):
+        try:
+            import zstandard
+        except ImportError:
+            raise RuntimeError("Reading .zst dumps needs the zstandard package") from None
+        reader = zstandard.ZstdDecompressor(max_window_size=ZSTD_MAX_WINDOW).stream_reader(
+            open(path, "rb"), closefd=True)
+        return io.TextIOWrapper(reader, encoding="utf-8", errors="replace")
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", errors="replace")
+    if path.endswith(".bz2"):
+        return bz2.open(path, "rt", encoding="utf-8", errors="replace")
+    return open(path, "r", encoding="utf-8", errors="replace")
+
+class NameMatcher:
+    """
+    Finds manifest queries named in a submission with the shared entity matcher,
+    dropping founder-only names whose companies the submission does not name.
+    """
+
+    def __init__(self, queries, founder_needs_company=FOUNDER_NEEDS_COMPANY):
+        self.matcher = EntityMatcher(queries)
+        # Keys of the companies each founder-only query needs alongside it, and the
+        # names of those too short for the automaton, which are looked for as words.
+        self.required = {}
+        self.short_companies = {}
+        if founder_needs_company:
+            for key, query in self.matcher.queries.items():
+                if "company" not in query["kinds"]:
+                    self.required[key] = {fold_key(company, "company")
+                                          for company in query["companies"]}
+                    self.short_companies[key] = [
+                        company for company in query["companies"]
+                        if fold_key(company, "company") not in self.matcher.queries]
+
+    def _has_company(self, key, found, text):
+        if self.required[key] & found:
+            return True
+        return any(self.matcher.mentions(text, company) for company in self.short_companies[key])
+
+    def match(self, text):
+        """Keys of the queries text mentions."""
+        found = self.matcher.find(text)
+        return {key for key in found
+                if key not in self.required or self._has_company(key, found, text)}
+
+_matcher = None
+
+def _init_worker(queries):
+    global _matcher
+    _matcher = NameMatcher(queries)
+
+def submission_to_record(submission):
+    permalink = submission.get("permalink")
+    return {
+        "title": submission.get("title"),
+        "url": submission.get("url") or (f"https://www.reddit.com{permalink}" if permalink else None),
+        "score": submission.get("score") or 0,
+        "comments": submission.get("num_comments") or 0,
+    }
+
+def match_lines(lines):
+    """
+    Worker task: parse a chunk of dump lines and return ([(key, record)], lines
+    that could not be parsed).
+    """
+    hits = []
+    bad = 0
+    for line in lines:
+        try:
+            submission = json.loads(line)
+        except ValueError:
+            bad += 1
+            continue
+        text = f"{submission.get('title') or ''}\n{submission.get('selftext') or ''}"
+        keys = _matcher.match(text)
+        if keys:
+            record = submission_to_record(submission)
+            hits.extend((key, record) for key in keys)
+    return hits, bad
+
+def read_chunks(paths, chunk_lines=CHUNK_LINES):
+    """Lines of every dump in turn, chunk_lines at a time."""
+    for path in paths:
+        print(f"Reading {path}")
+        with open_dump(path) as f:
+            chunk = []
+            for line in f:
+                if line.strip():
+                    chunk.append(line)
+                if len(chunk) >= chunk_lines:
+                    yield chunk
+                    chunk = []
+            if chunk:
+                yield chunk
+
+class TopResults:
+    """The max_results highest-scoring records per query, de-duplicated by URL."""
+
+    def __init__(self, max_results=MAX_RESULTS):
+        self.max_results = max_results
+        self.heaps = {}
+        self.seen = {}
+        self._order = 0
+
+    def add(self, key, record):
+        seen = self.seen.setdefault(key, set())
+        if record["url"] in seen:
+            return
+        seen.add(record["url"])
+        heap = self.heaps.setdefault(key, [])
+        self._order += 1
+        entry = (record["score"], self._order, record)
+        if len(heap) < self.max_results:
+            heapq.heappush(heap, entry)
+        elif entry > heap[0]:
+            heapq.heapreplace(heap, entry)
+
+    def results(self, key):
+        return [record for _, _, record in sorted(self.heaps.get(key, []), reverse=True)]
+
+def ingest(paths, queries, workers=None, max_results=MAX_RESULTS):
+    """
+    Match every submission in the dumps against queries (manifest entries) using
+    workers processes. Returns [{query, results}] in manifest order, results being
+    the highest-scoring matches as {title, url, score, comments}.
+    """
+    workers = workers or cpu_count()
+    top = TopResults(max_results)
+    lines = bad = matches = 0
+    started = time.monotonic()
+    with Pool(workers, initializer=_init_worker, initargs=(queries,)) as pool:
+        # Keep only a few chunks queued so a large dump is never read into memory.
+        pending = deque()
+
+        def collect(task):
+            nonlocal bad, matches
+            hits, chunk_bad = task.get()
+            bad += chunk_bad
+            matches += len(hits)
+            for key, record in hits:
+                top.add(key, record)
+
+        for chunk in read_chunks(paths):
+            lines += len(chunk)
+            pending.append(pool.apply_async(match_lines, (chunk,)))
+            if len(pending) >= workers * CHUNKS_PER_WORKER:
+                collect(pending.popleft())
+        while pending:
+            collect(pending.popleft())
+
+    elapsed = time.monotonic() - started
+    print(f"Matched {lines} submissions in {elapsed:.1f}s on {workers} workers: "
+          f"{matches} matches, {bad} unreadable lines")
+    return [{"query": query["text"], "results": top.results(query["key"])} for query in queries]
+
+def save(entries, path=OUTPUT_PATH):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(entries, f, indent=4, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+def main(paths, workers=None):
+    """
+    Ingest the given dumps and write the {query, results} list to OUTPUT_PATH.
+    """
+    missing = [path for path in paths if not os.path.exists(path)]
+    if not paths or missing:
+        print(f"Dump files not found: {', '.join(missing) or 'none given'}")
+        return
+    queries = load_manifest()
+    print(f"Total unique queries to match: {len(queries)}")
+    entries = ingest(paths, queries, workers=workers)
+    save(entries)
+    found = sum(1 for entry in entries if entry["results"])
+    print(f"Ingestion complete. {found} queries with matches saved in '{OUTPUT_PATH}'.")
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    workers = None
+    if "--workers" in args:
+        index = args.index("--workers")
+        workers = int(args[index + 1])
+        del args[index:index + 2]
+    main(args, workers=workers)
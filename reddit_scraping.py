@@ -1,101 +1,117 @@
 import praw
-import json
-import os
-import ast
-import time
-import random
+import sys
 
+import reddit_search
+from checkpoint_log import CheckpointLog
+from query_manifest import manifest_queries
+from retry_queue import RetryQueue, take_dead_letters
 
-with open("founders_companies.json", "r", encoding="utf-8") as f:
-    startup_data = json.load(f)
 
+# Unique, normalized company and founder names from founders_companies.json, or
+# with --replay only the queries in the dead-letter file.
+replay = "--replay" in sys.argv
+if replay:
+    search_queries = take_dead_letters("reddit_dead_letter.jsonl")
+else:
+    search_queries = manifest_queries()
+    print(f"Total unique queries to search: {len(search_queries)}")
 
-search_queries = []
-
-for entry in startup_data:
-    # Add company name if present
-    if "Company" in entry:
-        company = entry["Company"].strip()
-        if company:
-            search_queries.append(company)
-    
-    
-    if "Founders" in entry:
-        founders_field = entry["Founders"].strip()
-        # If the field looks like a list (e.g., "['Alice', 'Bob']")
-        if founders_field.startswith('[') and founders_field.endswith(']'):
-            try:
-                founders = ast.literal_eval(founders_field)
-                if isinstance(founders, list):
-                    for founder in founders:
-                        if founder and isinstance(founder, str):
-                            search_queries.append(founder.strip())
-                        elif founder:
-                            search_queries.append(str(founder).strip())
-                else:
-                    search_queries.append(str(founders).strip())
-            except Exception as e:
-                print(f"Error parsing Founders for entry {entry}: {e}")
-                
-                for founder in founders_field.split(','):
-                    if founder.strip():
-                        search_queries.append(founder.strip())
-        else:
-            
-            for founder in founders_field.split(','):
-                if founder.strip():
-                    search_queries.append(founder.strip())
-
-
-search_queries = list(set(search_queries))
-print(f"Total unique queries to search: {len(search_queries)}")
 
+CLIENT_ID = "beTKjKraeFN1liBYyCg9-Q"
+CLIENT_SECRET = "HFRJS0_0Hgx7FnNG8MFunNkQcyJJUA"
+USER_AGENT = "MyRedditScraper/1.0"
+# Search with concurrent OR-queries over the OAuth API, paced by Reddit's
+# rate-limit headers, instead of one PRAW search after another.
+ASYNC_SEARCH = True
 
 reddit = praw.Reddit(
-    client_id="beTKjKraeFN1liBYyCg9-Q",
-    client_secret="HFRJS0_0Hgx7FnNG8MFunNkQcyJJUA",
-    user_agent="MyRedditScraper/1.0"
+    client_id=CLIENT_ID,
+    client_secret=CLIENT_SECRET,
+    user_agent=USER_AGENT
 )
 
 
-def scrape_reddit(queries, limit=3):
+# One line per finished query; compacted into the list of {query, results} entries.
+checkpoint = CheckpointLog("reddit_scraped_data.jsonl", "reddit_scraped_data.json",
+                           shape="list", keep_empty=True)
+# Failed searches are retried between fresh ones; those that keep failing are
+# written here and can be rerun with --replay.
+retries = RetryQueue("reddit_dead_letter.jsonl")
+
+
+def search_query(query, limit, attempt=0):
+    # Search one query into the checkpoint log, or file it for a retry if it fails.
+    search_results = []
+    try:
+        for submission in reddit.subreddit("all").search(query, limit=limit):
+            search_results.append({
+                "title": submission.title,
+                "url": submission.url,
+                "score": submission.score,
+                "comments": submission.num_comments
+            })
+        checkpoint.append(query, search_results)
+    except Exception as e:
+        print(f"Error scraping query '{query}': {e}")
+        if not retries.schedule(query, e, attempt + 1):
+            checkpoint.append(query, search_results, status="error", error=e)
+        return None
+    return {"query": query, "results": search_results}
+
+
+def scrape_reddit(queries, limit=3, fresh=False):
+    # Only queries without a successful record in the checkpoint log are searched.
+    if not replay:
+        queries = checkpoint.resume(queries, fresh=fresh)
     scraped_results = []
     processed_count = 0
     total_queries = len(queries)
-    checkpoint_file = "reddit_scraped_data.json"
+
+    if ASYNC_SEARCH:
+        def handle_result(query, search_results, error):
+            nonlocal processed_count
+            processed_count += 1
+            if error is not None:
+                print(f"Error scraping query '{query}': {error}")
+                checkpoint.append(query, [], status="error", error=error)
+                return
+            print(f"Scraped Reddit for: {query} ({processed_count}/{total_queries})")
+            checkpoint.append(query, search_results)
+            scraped_results.append({"query": query, "results": search_results})
+
+        reddit_search.search_many(queries, CLIENT_ID, CLIENT_SECRET, USER_AGENT,
+                                  on_result=handle_result, limit=limit, retries=retries)
+        return scraped_results
+
+    def run_due():
+        # Retries whose backoff has run out are taken between fresh queries.
+        for retry, attempt in retries.due():
+            print(f"Retrying Reddit search for: {retry}")
+            result = search_query(retry, limit, attempt)
+            if result:
+                scraped_results.append(result)
     
     for query in queries:
         print(f"Scraping Reddit for: {query} ({processed_count+1}/{total_queries})")
-        search_results = []
-        try:
-            for submission in reddit.subreddit("all").search(query, limit=limit):
-                search_results.append({
-                    "title": submission.title,
-                    "url": submission.url,
-                    "score": submission.score,
-                    "comments": submission.num_comments
-                })
-        except Exception as e:
-            print(f"Error scraping query '{query}': {e}")
-        
-        scraped_results.append({"query": query, "results": search_results})
+        result = search_query(query, limit)
+        if result:
+            scraped_results.append(result)
         processed_count += 1
-        
-        
-        if processed_count % 5 == 0:
-            with open(checkpoint_file, "w", encoding="utf-8") as f:
-                json.dump(scraped_results, f, ensure_ascii=False, indent=4)
-            print(f"Checkpoint saved after {processed_count} queries.")
-            
-            
+        run_due()
+
+    # Then wait out the remaining retries.
+    while len(retries):
+        retries.wait()
+        run_due()
     
     return scraped_results
 
-# Run Reddit scraper with a limit of 5 submissions per query
-scraped_data = scrape_reddit(search_queries, limit=5)
+# Run Reddit scraper with a limit of 5 submissions per query (--fresh discards previous progress)
+scraped_data = scrape_reddit(search_queries, limit=5, fresh="--fresh" in sys.argv)
 
 # Save final results to a JSON file
-with open("reddit_scraped_data.json", "w", encoding="utf-8") as f:
-    json.dump(scraped_data, f, ensure_ascii=False, indent=4)
+checkpoint.compact()
+checkpoint.close()
+retries.report()
 
 print("Scraping complete. Data saved in 'reddit_scraped_data.json'.")
@@ -0,0 +1,220 @@
+import asyncio
+import os
+import time
+from urllib.parse import urlencode
+
+import http_client
+from async_fetch import AsyncFetcher
+from entity_matcher import get_matcher
+from retry_queue import collector, run_all
+
+# Reddit's OAuth API with an application-only token. REDDIT_TOKEN_URL and
+# REDDIT_OAUTH_BASE point it elsewhere (e.g. fake_endpoints).
+TOKEN_URL = os.environ.get("REDDIT_TOKEN_URL", "https://www.reddit.com/api/v1/access_token")
+OAUTH_BASE = os.environ.get("REDDIT_OAUTH_BASE", "https://oauth.reddit.com")
+# Names OR-ed into one search, the longest query string Reddit accepts, and the
+# most hits one search returns. Hits are split back to the names they mention.
+BATCH_SIZE = 8
+MAX_QUERY_LENGTH = 512
+SEARCH_LIMIT = 100
+# Searches in flight at once; the rate budget decides how fast they start.
+DEFAULT_CONCURRENCY = 4
+
+class RateBudget:
+    """
+    Paces requests by Reddit's X-Ratelimit-Remaining and X-Ratelimit-Reset headers,
+    spreading the remaining requests evenly over the rest of the window and
+    waiting for the reset once none are left.
+    """
+
+    def __init__(self):
+        self.remaining = None
+        self.reset_at = 0.0
+        self.next_at = 0.0
+        self.waited = 0.0
+        self._lock = asyncio.Lock()
+
+    async def take(self):
+        """Wait until the next request may start."""
+        async with self._lock:
+            now = time.monotonic()
+            if self.remaining is None or now >= self.reset_at:
+                # No headers seen yet, or the window has reset.
+                return
+            if self.remaining < 1:
+                start = self.reset_at
+            else:
+                start = max(now, self.next_at)
+            if start > now:
+                self.waited += start - now
+                await asyncio.sleep(start - now)
+            now = time.monotonic()
+            self.remaining = max(0.0, self.remaining - 1)
+            self.next_at = now + max(0.0, self.reset_at - now) / max(1.0, self.remaining)
+
+    def update(self, headers):
+        """Take the budget left in this window from a response's headers."""
+        try:
+            remaining = float(headers["X-Ratelimit-Remaining"])
+            # Reset is whole seconds rounded down; allow for the fraction.
+            reset_at = time.monotonic() + float(headers["X-Ratelimit-Reset"]) + 1
+        except (KeyError, ValueError):
+            return
+        # Headers of requests sent earlier can arrive late; within one window only
+        # trust them to lower the count.
+        if self.remaining is None or reset_at > self.reset_at + 1:
+            self.remaining = remaining
+        else:
+            self.remaining = min(self.remaining, remaining)
+        self.reset_at = reset_at
+
+def fetch_token(client_id, client_secret, user_agent):
+    """An application-only OAuth access token."""
+    response = http_client.post(TOKEN_URL, auth=(client_id, client_secret),
+                                data={"grant_type": "client_credentials"},
+                                headers={"User-Agent": user_agent})
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+def search_string(queries):
+    """The queries as quoted phrases OR-ed together."""
+    return " OR ".join(f'"{query.replace(chr(34), "")}"' for query in queries)
+
+def batches(queries, batch_size=BATCH_SIZE):
+    """Split queries into OR-query batches of at most batch_size names and MAX_QUERY_LENGTH."""
+    batch = []
+    for query in queries:
+        if batch and (len(batch) >= batch_size
+                      or len(search_string(batch + [query])) > MAX_QUERY_LENGTH):
+            yield batch
+            batch = []
+        batch.append(query)
+    if batch:
+        yield batch
+
+def search_url(queries, limit=SEARCH_LIMIT):
+    params = {"q": search_string(queries), "limit": limit, "sort": "relevance",
+              "type": "link", "raw_json": 1}
+    return f"{OAUTH_BASE}/r/all/search?{urlencode(params)}"
+
+def submission_to_record(submission):
+    return {
+        "title": submission.get("title"),
+        "url": submission.get("url"),
+        "score": submission.get("score"),
+        "comments": submission.get("num_comments"),
+    }
+
+def split_hits(queries, submissions, limit):
+    """
+    {query: records} for one batch's hits, in Reddit's order, at most limit per
+    query. A lone query keeps every hit; otherwise a hit goes to each query whose
+    name its title or selftext mentions (see entity_matcher).
+    """
+    matcher = get_matcher()
+    results = {query: [] for query in queries}
+    for submission in submissions:
+        text = f"{submission.get('title') or ''}\n{submission.get('selftext') or ''}"
+        named = set(matcher.entities(text)) if len(queries) > 1 else set()
+        for query in queries:
+            if len(results[query]) >= limit:
+                continue
+            if (len(queries) == 1 or query in named
+                    or query not in matcher and matcher.mentions(text, query)):
+                results[query].append(submission_to_record(submission))
+    return results
+
+class RedditSearch:
+    """
+    Concurrent Reddit searches sharing one token and one rate budget. Use it as an
+    async context manager.
+    """
+
+    def __init__(self, client_id, client_secret, user_agent, concurrency=DEFAULT_CONCURRENCY):
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.user_agent = user_agent
+        self.concurrency = concurrency
+        self.budget = RateBudget()
+        self.token = None
+        self.fetcher = None
+        self.stats = {"searches": 0, "queries": 0}
+
+    async def __aenter__(self):
+        self.token = await asyncio.to_thread(fetch_token, self.client_id, self.client_secret,
+                                             self.user_agent)
+        self.fetcher = AsyncFetcher(concurrency=self.concurrency, per_host=self.concurrency,
+                                    headers={"User-Agent": self.user_agent}, cache=False)
+        await self.fetcher.__aenter__()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.fetcher.__aexit__(exc_type, exc, tb)
+
+    async def _get_json(self, url):
+        for attempt in range(2):
+            await self.budget.take()
+            headers = {"Authorization": f"bearer {self.token}"}
+            try:
+                async with self.fetcher.stream(url, headers=headers) as response:
+                    self.budget.update(response.headers)
+                    return await response.json()
+            except Exception as e:
+                # Tokens last a day; fetch a new one once if this one has expired.
+                if getattr(e, "status", None) != 401 or attempt:
+                    raise
+                print("Reddit token expired, fetching a new one")
+                self.token = await asyncio.to_thread(fetch_token, self.client_id,
+                                                     self.client_secret, self.user_agent)
+
+    async def search(self, queries, limit):
+        """
+        {query: records} for one batch, with one OR-query. When the search comes
+        back full, hits for some names may have been crowded out, so names left
+        with fewer than limit hits are searched again on their own.
+        """
+        print(f"Searching Reddit for: {search_string(queries)}")
+        listing = await self._get_json(search_url(queries))
+        submissions = [child["data"] for child in listing.get("data", {}).get("children", [])]
+        self.stats["searches"] += 1
+        self.stats["queries"] += len(queries)
+        results = split_hits(queries, submissions, limit)
+        if len(queries) > 1 and len(submissions) >= SEARCH_LIMIT:
+            short = [query for query in queries if len(results[query]) < limit]
+            for query, records in zip(short, await asyncio.gather(
+                    *(self.search([query], limit) for query in short))):
+                results[query] = records[query]
+        return results
+
+async def _search_all(queries, on_result, limit, credentials, batch_size, concurrency, retries):
+    async with RedditSearch(*credentials, concurrency=concurrency) as reddit:
+        batch_slots = asyncio.Semaphore(concurrency)
+
+        async def attempt(batch):
+            async with batch_slots:
+                return await reddit.search(batch, limit)
+
+        def batch_done(batch, results, error):
+            for query in batch:
+                on_result(query, results[query] if results else None, error)
+
+        await run_all(list(batches(queries, batch_size)), attempt, batch_done, retries)
+    print(f"Reddit: {reddit.stats['queries']} queries in {reddit.stats['searches']} searches, "
+          f"{reddit.budget.waited:.1f}s waiting on the rate budget")
+
+def search_many(queries, client_id, client_secret, user_agent, on_result=None, limit=5,
+                batch_size=BATCH_SIZE, concurrency=DEFAULT_CONCURRENCY, retries=None):
+    """
+    Search Reddit for many queries, batch_size names per OR-query with several
+    searches in flight, paced by Reddit's rate-limit headers. With a RetryQueue,
+    failed batches are retried with backoff and permanent failures end up in its
+    dead-letter file.
+
+    on_result(query, records, error) is called as each batch finishes; error is the
+    exception raised for that query's batch (records is None then). Returns a dict
+    mapping each successful query to its records.
+    """
+    results, collect = collector(on_result)
+    asyncio.run(_search_all(list(queries), collect, limit, (client_id, client_secret, user_agent),
+                            batch_size, concurrency, retries))
+    return results
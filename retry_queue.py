@@ -0,0 +1,190 @@
+import asyncio
+import heapq
+import itertools
+import json
+import os
+import random
+import threading
+import time
+
+import aiohttp
+import requests
+
+# Attempts per item before it goes to the dead-letter file, and the backoff base and
+# cap in seconds. Delays use full jitter: uniform(0, min(cap, base * 2 ** attempt)).
+MAX_ATTEMPTS = 5
+BASE_DELAY = 2.0
+MAX_DELAY = 300.0
+RETRYABLE_STATUSES = (408, 425, 429, 500, 502, 503, 504)
+
+class TransientError(Exception):
+    """
+    A failure worth retrying that carries no status of its own, such as a block
+    page served with a 200.
+    """
+
+def backoff_delay(attempt):
+    """Seconds to wait before retry number attempt (1 for the first retry)."""
+    return random.uniform(0, min(MAX_DELAY, BASE_DELAY * 2 ** attempt))
+
+def is_transient(error):
+    """
+    True for errors worth retrying: timeouts, connection failures, and HTTP
+    statuses that signal overload or a temporary server fault.
+    """
+    if isinstance(error, (TransientError, requests.ConnectionError, requests.Timeout,
+                          aiohttp.ClientConnectionError, asyncio.TimeoutError, TimeoutError)):
+        return True
+    # Client libraries such as prawcore wrap the underlying requests error.
+    original = getattr(error, "original_exception", None)
+    if original is not None:
+        return is_transient(original)
+    response = getattr(error, "response", None)
+    status = getattr(error, "status", None) or getattr(response, "status_code", None)
+    return status in RETRYABLE_STATUSES
+
+class RetryQueue:
+    """
+    Delayed queue of failed work items. schedule() files an item for a later
+    attempt with exponential backoff and jitter, or writes it to the dead-letter
+    file once it is out of attempts or the error is permanent. Loops take due()
+    items between fresh ones, so retries never stall new work.
+    """
+
+    def __init__(self, dead_letter_path, max_attempts=MAX_ATTEMPTS):
+        self.dead_letter_path = dead_letter_path
+        self.max_attempts = max_attempts
+        self._heap = []
+        self._order = itertools.count()
+        self._lock = threading.Lock()
+        self.stats = {"retried": 0, "dead": 0}
+
+    def __len__(self):
+        return len(self._heap)
+
+    def retry_delay(self, item, error, attempt):
+        """
+        Seconds to wait before running item again after its attempt-th failure, or
+        None once it has been dead-lettered.
+        """
+        if attempt >= self.max_attempts or not is_transient(error):
+            self.dead_letter(item, error, attempt)
+            return None
+        self.stats["retried"] += 1
+        delay = backoff_delay(attempt)
+        print(f"Retrying {item!r} in {delay:.1f}s (attempt {attempt + 1}/{self.max_attempts}): {error}")
+        return delay
+
+    def schedule(self, item, error, attempt):
+        """
+        File item after its attempt-th failure. Returns False if it was dead-lettered.
+        """
+        delay = self.retry_delay(item, error, attempt)
+        if delay is None:
+            return False
+        with self._lock:
+            heapq.heappush(self._heap, (time.monotonic() + delay, next(self._order), item, attempt))
+        return True
+
+    def due(self):
+        """Pop every item whose retry time has come, as (item, attempts so far)."""
+        now = time.monotonic()
+        items = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                _, _, item, attempt = heapq.heappop(self._heap)
+                items.append((item, attempt))
+        return items
+
+    def wait(self):
+        """Sleep until the next item is due (for draining once fresh work runs out)."""
+        with self._lock:
+            delay = self._heap[0][0] - time.monotonic() if self._heap else 0
+        if delay > 0:
+            time.sleep(delay)
+
+    async def run_async(self, item, work):
+        """
+        Await work() until it succeeds or item is dead-lettered, sleeping between
+        attempts without blocking other tasks. Returns (result, error).
+        """
+        attempt = 0
+        while True:
+            try:
+                return await work(), None
+            except Exception as e:
+                attempt += 1
+                delay = self.retry_delay(item, e, attempt)
+                if delay is None:
+                    return None, e
+                await asyncio.sleep(delay)
+
+    def dead_letter(self, item, error, attempts):
+        """Append a permanent failure to the dead-letter file."""
+        record = {"item": item, "attempts": attempts, "error": f"{type(error).__name__}: {error}",
+                  "failed_at": time.strftime("%Y-%m-%dT%H:%M:%S")}
+        with self._lock:
+            with open(self.dead_letter_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self.stats["dead"] += 1
+        print(f"Gave up on {item!r} after {attempts} attempt(s); written to {self.dead_letter_path}")
+
+    def report(self):
+        print(f"Retries: {self.stats['retried']} scheduled, {self.stats['dead']} dead-lettered "
+              f"to {self.dead_letter_path}")
+
+async def run_all(items, attempt, on_result, retries=None):
+    """
+    Await attempt(item) for every item concurrently and call on_result(item, result,
+    error) as each one finishes (result is None on error). With a RetryQueue, failures
+    are retried through it; retries wait outside any slot attempt holds, so fresh
+    items keep flowing. Without one, each item gets a single try.
+    """
+    async def run(item):
+        if retries is not None:
+            result, error = await retries.run_async(item, lambda: attempt(item))
+        else:
+            try:
+                result, error = await attempt(item), None
+            except Exception as e:
+                result, error = None, e
+        on_result(item, result, error)
+
+    await asyncio.gather(*(run(item) for item in items))
+
+def collector(on_result=None):
+    """
+    (results, collect) for run_all callers: collect(item, result, error) stores each
+    success in the results dict and passes every outcome on to on_result.
+    """
+    results = {}
+
+    def collect(item, result, error):
+        if error is None:
+            results[item] = result
+        if on_result:
+            on_result(item, result, error)
+
+    return results, collect
+
+def take_dead_letters(path):
+    """
+    Items from a dead-letter file, for replaying them on their own. Items that were
+    dead-lettered as a batch (a list) come back as their members. The file is moved
+    to path + ".replayed" so failures of the replay start a fresh dead-letter file.
+    """
+    if not os.path.exists(path):
+        print(f"No dead-letter file at {path}")
+        return []
+    items = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                item = json.loads(line)["item"]
+            except (ValueError, KeyError):
+                continue
+            items.extend(item if isinstance(item, list) else [item])
+    os.replace(path, path + ".replayed")
+    items = list(dict.fromkeys(items))
+    print(f"Replaying {len(items)} dead-lettered items from {path}")
+    return items
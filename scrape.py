@@ -1,47 +1,94 @@
-import requests
-from bs4 import BeautifulSoup
-import json
-import time
-import random
-import pandas as pd
 import os
-import ast
+import sys
+import asyncio
+
+import head_excerpt
+import http_client
+import pagination
+import rate_limit
+import wp_rest
+from html_parsing import make_soup, extract_excerpt, TECHCRUNCH_RESULTS
+from checkpoint_log import CheckpointLog
+from entity_matcher import article_text, get_matcher, write_attribution
+from http_cache import get_cache
+from query_manifest import manifest_queries
+from url_frontier import get_frontier
+from async_fetch import AsyncFetcher, DEFAULT_CONCURRENCY, DEFAULT_PER_HOST
+from retry_queue import RetryQueue, collector, is_transient, run_all, take_dead_letters
+
+# Read article pages only up to the meta description instead of downloading them whole.
+STREAM_EXCERPTS = True
+# Search through the WordPress REST API, which returns excerpts with the results, and
+# only parse the HTML search page (plus one request per article) if it is unavailable.
+WP_REST_API = True
 
 def get_article_excerpt(link):
     """
     Given an article URL, fetch the page and try to extract its excerpt.
     First, look for a meta description. If not found, try grabbing the first paragraph
     from a container with class "article-content".
+    Articles already fetched in this crawl generation are served from the URL frontier.
     """
     try:
-        print(f"Fetching excerpt from: {link}")
-        response = requests.get(link)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
-       
-        meta_desc = soup.find("meta", {"name": "description"})
-        if meta_desc and meta_desc.get("content"):
-            return meta_desc["content"].strip()
-        
-        article_body = soup.find("div", class_="article-content")
-        if article_body:
-            p_tag = article_body.find("p")
-            if p_tag:
-                return p_tag.get_text(strip=True)
-        return ""
+        return get_frontier().memoize(link, lambda: _fetch_article_excerpt(link), source="techcrunch")
     except Exception as e:
+        # Transient failures fail the query so it is retried as a whole;
+        # otherwise the article is kept without an excerpt.
+        if is_transient(e):
+            raise
         print(f"Error fetching excerpt from {link}: {e}")
         return ""
 
-def scrape_techcrunch(query):
+def _fetch_article_excerpt(link):
+    print(f"Fetching excerpt from: {link}")
+    if STREAM_EXCERPTS:
+        return head_excerpt.stream_excerpt(link, parse_article_excerpt)
+    response = http_client.get(link)
+    response.raise_for_status()
+    return parse_article_excerpt(response.text)
+
+def parse_article_excerpt(html):
     """
-    Scrape TechCrunch for articles related to the given query.
+    Extract the excerpt from an article page's HTML: the meta description if present,
+    otherwise the first paragraph inside "article-content".
     """
-    url = f"https://techcrunch.com/?s={query}"
+    return extract_excerpt(html, "div", "article-content")
+
+def scrape_techcrunch(query, page=1):
+    """
+    Scrape one page of TechCrunch results for articles related to the given query.
+    """
+    if WP_REST_API:
+        try:
+            return wp_rest.search_posts("techcrunch", query, page)
+        except wp_rest.ApiUnavailable as e:
+            print(f"{e}; falling back to the HTML search page")
+
+    url = techcrunch_search_url(query, page)
     print(f"Scraping URL: {url}")
-    response = requests.get(url)
+    response = http_client.get(url)
     response.raise_for_status()
-    soup = BeautifulSoup(response.text, 'html.parser')
+
+    results = parse_techcrunch_results(response.text, query)
+    for article_data in results:
+        if article_data["link"] != "N/A":
+            article_data["excerpt"] = get_article_excerpt(article_data["link"])
+    return results
+
+def techcrunch_search_url(query, page=1):
+    """
+    Build the TechCrunch search URL for a query and result page.
+    """
+    if page == 1:
+        return f"https://techcrunch.com/?s={query}"
+    return f"https://techcrunch.com/page/{page}/?s={query}"
+
+def parse_techcrunch_results(html, query):
+    """
+    Parse a TechCrunch search results page into article dicts.
+    The "excerpt" field is left empty; callers fill it in from the article page.
+    """
+    soup = make_soup(html, TECHCRUNCH_RESULTS)
     
     results_ul = soup.find('ul', class_='wp-block-post-template')
     if not results_ul:
@@ -100,10 +147,6 @@ def scrape_techcrunch(query):
         if time_tag:
             date = time_tag.get_text(strip=True)
         
-        excerpt = ""
-        if link != "N/A":
-            excerpt = get_article_excerpt(link)
-            
         article_data = {
             "title": title,
             "link": link,
@@ -111,126 +154,169 @@ def scrape_techcrunch(query):
             "category": category,
             "author": author,
             "image": image_url,
-            "excerpt": excerpt
+            "excerpt": ""
         }
         results.append(article_data)
     
     return results
 
-def load_json_data(json_filepath):
+async def fetch_article_excerpt(fetcher, link):
     """
-    Load JSON data from the given filepath.
+    Async counterpart of get_article_excerpt.
     """
+    async def fetch():
+        print(f"Fetching excerpt from: {link}")
+        if STREAM_EXCERPTS:
+            return await head_excerpt.stream_excerpt_async(fetcher, link, parse_article_excerpt)
+        return parse_article_excerpt(await fetcher.fetch_text(link))
+
     try:
-        with open(json_filepath, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        print(f"Loaded JSON data from {json_filepath}")
-        return data
+        return await get_frontier().memoize_async(link, fetch, source="techcrunch")
     except Exception as e:
-        print(f"Error loading JSON file {json_filepath}: {e}")
-        return None
+        if is_transient(e):
+            raise
+        print(f"Error fetching excerpt from {link}: {e}")
+        return ""
 
-def save_checkpoint(results):
+async def scrape_techcrunch_async(fetcher, query, page=1):
     """
-    Save/update a checkpoint file with the current results.
+    Async counterpart of scrape_techcrunch: fetches the search page, then all
+    article excerpts for it concurrently. Returns the same article dicts.
     """
-    checkpoint_filename = "techcrunch_articles_checkpoint.json"
-    try:
-        with open(checkpoint_filename, "w", encoding="utf-8") as f:
-            json.dump(results, f, ensure_ascii=False, indent=4)
-        print(f"Checkpoint updated: {checkpoint_filename}")
-    except Exception as e:
-        print(f"Error saving checkpoint: {e}")
+    if WP_REST_API:
+        try:
+            return await wp_rest.search_posts_async(fetcher, "techcrunch", query, page)
+        except wp_rest.ApiUnavailable as e:
+            print(f"{e}; falling back to the HTML search page")
+
+    url = techcrunch_search_url(query, page)
+    print(f"Scraping URL: {url}")
+    html = await fetcher.fetch_text(url)
+    results = parse_techcrunch_results(html, query)
+
+    with_links = [article for article in results if article["link"] != "N/A"]
+    excerpts = await asyncio.gather(
+        *(fetch_article_excerpt(fetcher, article["link"]) for article in with_links)
+    )
+    for article, excerpt in zip(with_links, excerpts):
+        article["excerpt"] = excerpt
+    return results
+
+async def _scrape_all(queries, on_result, concurrency, per_host, max_pages, relevant, retries):
+    async with AsyncFetcher(concurrency=concurrency, per_host=per_host) as fetcher:
+        # Bound the number of queries in flight so excerpts of started queries are
+        # not starved by thousands of queued search pages.
+        query_slots = asyncio.Semaphore(concurrency)
+
+        async def attempt(query):
+            async with query_slots:
+                page_size = wp_rest.page_size("techcrunch") if WP_REST_API else None
+                articles, _ = await pagination.paginate_async(
+                    lambda page: scrape_techcrunch_async(fetcher, query, page), query,
+                    max_pages=max_pages, page_size=page_size,
+                    relevant=relevant and (lambda article: relevant(article, query)))
+                return articles
+
+        await run_all(queries, attempt, on_result, retries)
+
+def scrape_techcrunch_many(queries, on_result=None, concurrency=DEFAULT_CONCURRENCY,
+                           per_host=DEFAULT_PER_HOST, max_pages=pagination.DEFAULT_MAX_PAGES,
+                           relevant=None, retries=None):
+    """
+    Scrape TechCrunch for many queries concurrently, up to max_pages result pages
+    each. Pagination stops early once a page adds no new links or, when given,
+    no article for which relevant(article, query) is true; pagination.depths
+    records the depth used per query. With a RetryQueue, transient failures are
+    retried with backoff and permanent ones end up in its dead-letter file.
+
+    on_result(query, articles, error) is called as each query finishes; error is the
+    exception raised for that query (articles is None then). Returns a dict mapping
+    each successful query to its article list.
+    """
+    results, collect = collector(on_result)
+    asyncio.run(_scrape_all(queries, collect, concurrency, per_host, max_pages, relevant, retries))
+    return results
+
+# One line per finished query; compacted into the query -> articles JSON.
+checkpoint = CheckpointLog("techcrunch_articles_checkpoint.jsonl", "techcrunch_articles_checkpoint.json")
+# Queries that kept failing; rerun just these with --replay.
+retries = RetryQueue("techcrunch_dead_letter.jsonl")
+# Entity -> every scraped article naming it, whichever query found the article.
+ENTITIES_PATH = "techcrunch_articles_entities.json"
 
 def is_relevant(article, query):
     """
     Determine if an article is relevant to the query.
-    Checks if the query appears in the title or excerpt (case-insensitive).
+    Checks if the title or excerpt names the query as whole words, ignoring case
+    and accents. The article's entities are found in the same single pass.
     """
-    query_lower = query.lower()
-    title = article.get("title", "").lower()
-    excerpt = article.get("excerpt", "").lower()
-    return query_lower in title or query_lower in excerpt
+    matcher = get_matcher()
+    entities = matcher.article_entities(article)
+    if query in matcher:
+        return query in entities
+    return matcher.mentions(article_text(article), query)
 
-def main():
-    a = 0
+def main(fresh=False, replay=False):
+    """
+    Scrape every query not yet completed in the checkpoint log.
+    Pass --fresh on the command line to discard previous progress and start over,
+    or --replay to rerun only the queries in the dead-letter file.
+    """
     json_filepath = "founders_companies.json"
     
     if not os.path.exists(json_filepath):
         print(f"JSON file {json_filepath} does not exist. Please create it from your CSV first.")
         return
 
-    data = load_json_data(json_filepath)
-    if data is None:
-        return
-    df = pd.DataFrame(data)
-    
-    queries = set()
-    
-    if 'Founders' in df.columns:
-        for entry in df['Founders'].dropna().unique().tolist():
-            try:
-                founder_list = ast.literal_eval(entry)
-                if isinstance(founder_list, list):
-                    for name in founder_list:
-                        if name:
-                            queries.add(name.strip())
-                else:
-                    queries.add(str(founder_list).strip())
-            except Exception as e:
-                print(f"Error parsing founders entry: {entry}. Error: {e}")
-                queries.add(entry.strip())
+    if replay:
+        queries = take_dead_letters(retries.dead_letter_path)
     else:
-        print("Column 'Founders' not found in JSON data.")
-    
-    if 'Company' in df.columns:
-        companies = df['Company'].dropna().unique().tolist()
-        queries.update([company.strip() for company in companies if company.strip()])
-        print(str(a) + " many times executed")
-        a = a + 1
-    else:
-        print("Column 'Company' not found in JSON data.")
-    
-    queries = [q for q in queries if q]
+        queries = manifest_queries(json_filepath)
+        print(f"Total unique queries to search (Founders & Companies): {len(queries)}")
+        queries = checkpoint.resume(queries, fresh=fresh)
     total_queries = len(queries)
-    print(f"Total unique queries to search (Founders & Companies): {total_queries}")
 
-    all_results = {}
     processed_count = 0
-    
-    save_checkpoint(all_results)
 
-    for query in queries:
-        print(f"\n--- Scraping results for query: '{query}' ---")
-        try:
-            articles = scrape_techcrunch(query)
-            if articles:
-                relevant_articles = [article for article in articles if is_relevant(article, query)]
-                if relevant_articles:
-                    all_results[query] = relevant_articles
-                else:
-                    print(f"No relevant articles found for query: '{query}'")
-            else:
+    def handle_result(query, articles, error):
+        nonlocal processed_count
+        print(f"\n--- Results for query: '{query}' ---")
+        if error is not None:
+            print(f"Error processing query '{query}': {error}")
+            checkpoint.append(query, [], status="error", error=error)
+        else:
+            # Every article is credited to each manifest entity it names, not only to
+            # the query that found it. Pagination has already found the entities of
+            # most articles while checking relevance.
+            articles = articles or []
+            relevant_articles, attributed = [], []
+            for article in articles:
+                if is_relevant(article, query):
+                    relevant_articles.append(article)
+                elif article["entities"]:
+                    attributed.append(article)
+            if not articles:
                 print(f"No articles found for query: '{query}'")
-        except Exception as e:
-            print(f"Error processing query '{query}': {e}")
+            elif not relevant_articles:
+                print(f"No relevant articles found for query: '{query}'")
+            checkpoint.append(query, relevant_articles, pages=pagination.depths.get(query),
+                              attributed=attributed)
         
         processed_count += 1
         print(f"Processed {processed_count} out of {total_queries} queries.")
-        
-        if processed_count % 2 == 0:
-            save_checkpoint(all_results)
-            print(f"processed={processed_count}")
-    
-    save_checkpoint(all_results)
+
+    # Deeper result pages are only read while they keep turning up relevant articles.
+    scrape_techcrunch_many(queries, on_result=handle_result, relevant=is_relevant, retries=retries)
     
-    articles_json_filepath = "techcrunch_articles_checkpoint.json"
-    try:
-        with open(articles_json_filepath, "w", encoding="utf-8") as f:
-            json.dump(all_results, f, ensure_ascii=False, indent=4)
-        print(f"Articles results saved to {articles_json_filepath}")
-    except Exception as e:
-        print(f"Error saving final results: {e}")
+    checkpoint.compact()
+    checkpoint.close()
+    write_attribution(checkpoint, ENTITIES_PATH)
+    get_cache().report()
+    get_frontier().report()
+    head_excerpt.report()
+    pagination.report()
+    rate_limit.report()
+    retries.report()
 
 if __name__ == "__main__":
-    main()
+    main(fresh="--fresh" in sys.argv, replay="--replay" in sys.argv)
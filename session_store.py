@@ -0,0 +1,104 @@
+import os
+import pickle
+import time
+from urllib.parse import urlparse
+
+from hybrid_session import cookie_session
+
+SESSION_DIR = "sessions"
+# A session validated this recently is reused without probing again.
+PROBE_INTERVAL = 3600
+PROBE_TIMEOUT = 15
+
+# Per-site home page, login page and a page that only renders for logged-in users. A
+# probe that ends up on a URL containing "login" (or fails) means the session is gone.
+SITES = {
+    "yourstory": {
+        "home_url": "https://yourstory.com",
+        "login_url": "https://yourstory.com/login",
+        "probe_url": "https://yourstory.com/profile",
+    },
+    "inc42": {
+        "home_url": "https://inc42.com",
+        "login_url": "https://inc42.com/login",
+        "probe_url": "https://inc42.com/my-account/",
+    },
+}
+
+def session_path(site):
+    return os.path.join(SESSION_DIR, f"{site}.pkl")
+
+def _read(site):
+    path = session_path(site)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    except Exception as e:
+        print(f"Ignoring unreadable session file {path}: {e}")
+        return None
+
+def _write(site, record):
+    os.makedirs(SESSION_DIR, exist_ok=True)
+    path = session_path(site)
+    with open(path + ".tmp", "wb") as f:
+        pickle.dump(record, f)
+    os.replace(path + ".tmp", path)
+
+def save_cookies(site, cookies):
+    """
+    Store a site's browser cookies (as returned by driver.get_cookies()).
+    """
+    now = time.time()
+    _write(site, {"cookies": cookies, "saved_at": now, "validated_at": now})
+    print(f"Session for {site} saved to {session_path(site)}")
+
+def load_cookies(site):
+    """
+    The site's stored cookies with expired ones dropped, or None if there are none.
+    """
+    record = _read(site)
+    if not record:
+        return None
+    now = time.time()
+    cookies = [cookie for cookie in record["cookies"]
+               if not cookie.get("expiry") or cookie["expiry"] > now]
+    return cookies or None
+
+def probe(site, cookies):
+    """
+    Cheap HTTP check that the cookies still carry a logged-in session.
+    """
+    config = SITES[site]
+    try:
+        response = cookie_session(cookies).get(config["probe_url"], timeout=PROBE_TIMEOUT)
+    except Exception as e:
+        print(f"Session probe for {site} failed: {e}")
+        return False
+    return response.ok and "login" not in urlparse(response.url).path.lower()
+
+def ensure_session(site, login):
+    """
+    Return valid cookies for site, reusing the stored session when it is still
+    logged in. Only when it is missing, expired or fails the probe is login() called;
+    it must return the new cookies, which are then stored.
+    """
+    record = _read(site)
+    cookies = load_cookies(site)
+    if cookies:
+        if time.time() - record.get("validated_at", 0) < PROBE_INTERVAL:
+            print(f"Reusing {site} session validated {time.time() - record['validated_at']:.0f}s ago")
+            return cookies
+        if probe(site, cookies):
+            record["validated_at"] = time.time()
+            _write(site, record)
+            print(f"Reusing {site} session (probe succeeded)")
+            return cookies
+        print(f"Stored {site} session is no longer valid")
+    else:
+        print(f"No stored {site} session")
+
+    cookies = login()
+    save_cookies(site, cookies)
+    return cookies
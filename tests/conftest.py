@@ -0,0 +1,32 @@
+import os
+import shutil
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import fake_endpoints
+
+
+@pytest.fixture(scope="session", autouse=True)
+def workdir(tmp_path_factory):
+    """
+    Run every test in a scratch directory holding a copy of the manifest, so caches,
+    checkpoints and outputs never touch the working tree.
+    """
+    path = tmp_path_factory.mktemp("run")
+    shutil.copy(os.path.join(ROOT, "founders_companies.json"), path)
+    previous = os.getcwd()
+    os.chdir(path)
+    yield path
+    os.chdir(previous)
+
+
+@pytest.fixture(scope="session")
+def fake_server():
+    """Base URL of fake_endpoints served for the whole session."""
+    server, base_url = fake_endpoints.start()
+    yield base_url
+    server.shutdown()
@@ -0,0 +1,27 @@
+import asyncio
+
+import pytest
+import requests
+
+import scrape
+from async_fetch import AsyncFetcher
+
+
+def test_transient_excerpt_error_fails_the_query(fake_server):
+    with pytest.raises(requests.HTTPError):
+        scrape.get_article_excerpt(f"{fake_server}/status/500")
+
+
+def test_permanent_excerpt_error_gives_empty_excerpt(fake_server):
+    assert scrape.get_article_excerpt(f"{fake_server}/status/404") == ""
+
+
+def test_transient_excerpt_error_fails_the_query_async(fake_server):
+    async def fetch(path):
+        async with AsyncFetcher(cache=False) as fetcher:
+            return await scrape.fetch_article_excerpt(fetcher, f"{fake_server}{path}")
+
+    with pytest.raises(Exception) as error:
+        asyncio.run(fetch("/status/502"))
+    assert error.value.status == 502
+    assert asyncio.run(fetch("/status/410")) == ""
@@ -0,0 +1,23 @@
+import asyncio
+
+import fake_endpoints
+import head_excerpt
+from async_fetch import AsyncFetcher
+
+
+def parse_full(html):
+    return "full body"
+
+
+def test_page_without_charset_streams_the_description(fake_server):
+    url = f"{fake_server}{fake_endpoints.NO_CHARSET_PATH}"
+    assert head_excerpt.stream_excerpt(url, parse_full) == "Hello"
+
+
+def test_page_without_charset_streams_the_description_async(fake_server):
+    async def fetch():
+        async with AsyncFetcher(cache=False) as fetcher:
+            return await head_excerpt.stream_excerpt_async(
+                fetcher, f"{fake_server}{fake_endpoints.NO_CHARSET_PATH}", parse_full)
+
+    assert asyncio.run(fetch()) == "Hello"
@@ -0,0 +1,100 @@
+import pytest
+
+import factor_daily
+import html_parsing
+import inc42
+import scrape
+
+# Real WordPress and Algolia markup carries layout classes next to the ones the
+# scrapers look for.
+TECHCRUNCH_PAGE = """
+<html><body><header><ul class="menu"><li>Startups</li></ul></header>
+<ul class="wp-block-post-template is-layout-flow wp-block-post-template-is-layout-flow">
+  <li class="wp-block-post post-1"><div class="wp-block-techcrunch-card wp-block-null">
+    <div class="loop-card loop-card--default">
+      <figure class="loop-card__figure"><img src="https://techcrunch.com/100ms.jpg"></figure>
+      <div class="loop-card__content">
+        <div class="loop-card__cat-group"><a class="loop-card__cat is-primary">Startups</a></div>
+        <h3 class="loop-card__title"><a class="loop-card__title-link"
+            href="https://techcrunch.com/2022/01/11/100ms-series-b/">100ms raises $20M</a></h3>
+        <div class="loop-card__meta"><ul class="loop-card__meta-item loop-card__author-list">
+          <li><a class="loop-card__author">Manish Singh</a></li></ul></div>
+        <time>January 11, 2022</time>
+      </div>
+    </div>
+  </div></li>
+</ul></body></html>
+"""
+
+FACTORDAILY_PAGE = """
+<html><body><div class="search-post-list row clearfix">
+  <div class="single col-md-4">
+    <div class="category-div"><a>Startups</a></div>
+    <h3><a href="https://factordaily.com/100ms/">Inside 100ms</a></h3>
+    <div class="date">Feb 2, 2022</div>
+    <div class="excerpt">Live video infrastructure.</div>
+    <div class="author-div"><a>FactorDaily Staff</a></div>
+  </div>
+</div></body></html>
+"""
+
+INC42_PAGE = """
+<html><body><ol class="ais-Hits-list search-hits">
+  <li class="ais-Hits-item"><div class="ais-hits--content card">
+    <h2 class="entry-title"><a href="https://inc42.com/buzz/100ms/">100ms raises funding</a></h2>
+    <div class="meta-wrapper"><span class="date">11 Jan 2022</span></div>
+  </div></li>
+</ol></body></html>
+"""
+
+ARTICLE_PAGE = """
+<html><body><div class="post-content entry-content"><p>Founded in 2020, 100ms builds live video.</p></div></body></html>
+"""
+
+
+@pytest.fixture(params=["lxml", "html.parser"])
+def backend(request, monkeypatch):
+    """Parse with each BeautifulSoup tree builder, without selectolax."""
+    monkeypatch.setattr(html_parsing, "PARSER_BACKEND", request.param)
+    monkeypatch.setattr(html_parsing, "USE_SELECTOLAX", False)
+    return request.param
+
+
+def test_techcrunch_results_with_layout_classes(backend):
+    [article] = scrape.parse_techcrunch_results(TECHCRUNCH_PAGE, "100ms")
+    assert article == {
+        "title": "100ms raises $20M",
+        "link": "https://techcrunch.com/2022/01/11/100ms-series-b/",
+        "date": "January 11, 2022",
+        "category": "Startups",
+        "author": "Manish Singh",
+        "image": "https://techcrunch.com/100ms.jpg",
+        "excerpt": "",
+    }
+
+
+def test_factordaily_results_with_layout_classes(backend, monkeypatch):
+    class FakeResponse:
+        status_code = 200
+        text = FACTORDAILY_PAGE
+
+    monkeypatch.setattr(factor_daily, "WP_REST_API", False)
+    monkeypatch.setattr(factor_daily.http_client, "get", lambda *args, **kwargs: FakeResponse())
+    [post] = factor_daily.scrape_factordaily("100ms")
+    assert post["title"] == "Inside 100ms"
+    assert post["link"] == "https://factordaily.com/100ms/"
+    assert post["author"] == "FactorDaily Staff"
+
+
+def test_inc42_hits_with_layout_classes(backend):
+    assert inc42.parse_inc42_hits(INC42_PAGE) == [{
+        "title": "100ms raises funding",
+        "link": "https://inc42.com/buzz/100ms/",
+        "date": "11 Jan 2022",
+        "category": None,
+    }]
+
+
+def test_excerpt_container_with_layout_classes(backend):
+    assert (html_parsing.extract_excerpt(ARTICLE_PAGE, "div", "post-content")
+            == "Founded in 2020, 100ms builds live video.")
@@ -0,0 +1,76 @@
+import json
+
+import pytest
+
+import fake_endpoints
+import inc42_search
+from checkpoint_log import CheckpointLog
+
+
+@pytest.fixture
+def algolia(fake_server, monkeypatch):
+    """Search the fake index, with the config discovered from the fake search page."""
+    for name in ("INC42_ALGOLIA_APP_ID", "INC42_ALGOLIA_API_KEY", "INC42_ALGOLIA_INDEX"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setenv("INC42_ALGOLIA_URL", fake_server)
+    monkeypatch.setattr(inc42_search, "SEARCH_PAGE_URL", f"{fake_server}/inc42/")
+    monkeypatch.setattr(inc42_search, "_config", None)
+
+
+def test_config_is_discovered_from_the_search_page(algolia, fake_server):
+    assert inc42_search.algolia_config() == {
+        "app_id": fake_endpoints.FAKE_ALGOLIA_APP_ID,
+        "api_key": fake_endpoints.FAKE_ALGOLIA_API_KEY,
+        "index": fake_endpoints.FAKE_ALGOLIA_INDEX,
+        "url": fake_server,
+    }
+
+
+def test_discover_config_without_marker():
+    assert inc42_search.discover_config("<html><body>No search here</body></html>") is None
+
+
+def test_batch_returns_records_per_query_in_order(algolia):
+    results = inc42_search.search_batch(["Atul Todi", "100ms", "no such startup"])
+    assert [[record["title"] for record in records] for records in results] == [
+        ["How Atul Todi Built 10Times Into An Events Marketplace"],
+        ["100ms Raises $20 Mn To Power Live Video Apps"],
+        [],
+    ]
+    assert results[1][0] == {
+        "title": "100ms Raises $20 Mn To Power Live Video Apps",
+        "link": "https://inc42.com/buzz/100ms-raises-20-mn/",
+        "date": "August 25, 2023",
+        "category": "Buzz",
+        "excerpt": "Live video infrastructure startup 100ms has raised $20 Mn…",
+    }
+
+
+def test_search_many_reports_every_query(algolia):
+    seen = {}
+    results = inc42_search.search_many(["100ms", "10Times", "Kshitij Gupta"], batch_size=2,
+                                       on_result=lambda query, records, error: seen.update({query: error}))
+    assert seen == {"100ms": None, "10Times": None, "Kshitij Gupta": None}
+    assert [record["category"] for record in results["10Times"]] == ["Features"]
+
+
+def test_search_many_passes_batch_errors_on(algolia, monkeypatch):
+    monkeypatch.setattr(inc42_search, "_config", dict(inc42_search.algolia_config(), api_key="wrong"))
+    errors = {}
+    results = inc42_search.search_many(["100ms", "10Times"],
+                                       on_result=lambda query, records, error: errors.update({query: error}))
+    assert results == {}
+    assert all(error.response.status_code == 403 for error in errors.values())
+
+
+def test_records_checkpoint_compacts_to_a_flat_list(tmp_path):
+    checkpoint = CheckpointLog(str(tmp_path / "results.jsonl"), str(tmp_path / "results.json"),
+                               shape="records")
+    checkpoint.append("100ms", [{"title": "A"}, {"title": "B"}])
+    checkpoint.append("10Times", [])
+    checkpoint.append("Atul Todi", [{"title": "C"}])
+    checkpoint.compact()
+    checkpoint.close()
+    with open(tmp_path / "results.json", encoding="utf-8") as f:
+        assert json.load(f) == [{"title": "A", "query": "100ms"}, {"title": "B", "query": "100ms"},
+                                {"title": "C", "query": "Atul Todi"}]
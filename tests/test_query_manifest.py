@@ -0,0 +1,11 @@
+from query_manifest import clean_text, fold_key, manifest_queries
+
+
+def test_clean_text_decodes_html_entities():
+    assert (clean_text("Vikas Kamra (We are hiring for #datascience &amp; #machinelearning)")
+            == "Vikas Kamra (We are hiring for #datascience & #machinelearning)")
+    assert fold_key("Tom &amp; Jerry Pvt Ltd", "company") == "tom & jerry"
+
+
+def test_manifest_has_no_html_entities():
+    assert not [query for query in manifest_queries("founders_companies.json") if "&amp;" in query]
@@ -0,0 +1,76 @@
+import pytest
+
+import rate_limit
+from rate_limit import DomainLimiter
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limit.time, "monotonic", clock)
+    return clock
+
+
+def finish(limiter, clock, latencies, status=200, retry_after=None):
+    """Release one request per latency, a request every 0.3s."""
+    for latency in latencies:
+        clock.now += 0.3
+        limiter.in_flight += 1
+        limiter.release(status, latency, retry_after)
+
+
+def test_successes_raise_rate_and_concurrency(clock):
+    limiter = DomainLimiter("example.com", rate=4.0, concurrency=2)
+    finish(limiter, clock, [0.2] * 10)
+    assert limiter.rate == pytest.approx(5.0)
+    assert limiter.concurrency > 2
+
+
+def test_one_fast_response_does_not_pin_the_rate(clock):
+    limiter = DomainLimiter("example.com", rate=8.0)
+    finish(limiter, clock, [0.08] + [0.15, 0.6, 0.3, 0.45] * 50)
+    assert limiter.rate > 8.0
+    assert limiter.concurrency > rate_limit.DEFAULT_CONCURRENCY
+
+
+def test_short_latency_spike_does_not_back_off(clock):
+    limiter = DomainLimiter("example.com", rate=8.0)
+    finish(limiter, clock, [0.2] * 50 + [2.0] * 5 + [0.2] * 20)
+    assert limiter.rate > 8.0
+
+
+def test_sustained_latency_rise_backs_off(clock):
+    limiter = DomainLimiter("example.com", rate=8.0, concurrency=8)
+    finish(limiter, clock, [0.2] * 50)
+    rate = limiter.rate
+    finish(limiter, clock, [2.0] * (rate_limit.SLOW_STREAK + 5))
+    assert limiter.rate < rate
+    assert limiter.concurrency < 8
+
+
+def test_throttled_response_pauses_and_halves(clock):
+    limiter = DomainLimiter("example.com", rate=8.0, concurrency=8)
+    finish(limiter, clock, [0.2], status=429, retry_after="30")
+    assert limiter.rate == 4.0
+    assert limiter.concurrency == 4
+    assert limiter.paused_until == pytest.approx(clock.now + 30)
+    assert limiter._try_acquire() == pytest.approx(30)
+
+
+def test_errors_back_off_once_per_interval(clock):
+    limiter = DomainLimiter("example.com", rate=8.0, concurrency=8)
+    finish(limiter, clock, [0.2, 0.2], status=503)
+    assert limiter.rate == 4.0
+    clock.now += rate_limit.BACKOFF_INTERVAL
+    finish(limiter, clock, [0.2], status=None)
+    assert limiter.rate == 2.0
+    assert limiter.stats["throttled"] == 2
+    assert limiter.stats["errors"] == 1
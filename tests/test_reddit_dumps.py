@@ -0,0 +1,69 @@
+import json
+
+import pytest
+
+import fake_endpoints
+import reddit_dumps
+from query_manifest import load_manifest
+
+FORMATS = ["dump.ndjson", "dump.gz", "dump.bz2", "dump.zst"]
+
+
+@pytest.fixture(scope="module")
+def queries():
+    return load_manifest()
+
+
+@pytest.mark.parametrize("name", FORMATS)
+def test_every_format_reads_back(tmp_path, name):
+    if name.endswith(".zst"):
+        pytest.importorskip("zstandard")
+    path = str(tmp_path / name)
+    fake_endpoints.write_reddit_dump(path, copies=2)
+    with reddit_dumps.open_dump(path) as f:
+        submissions = [json.loads(line) for line in f]
+    assert len(submissions) == 2 * len(fake_endpoints.REDDIT_SUBMISSIONS)
+
+
+def test_ingest_writes_query_results(tmp_path, queries):
+    paths = [str(tmp_path / "a.gz"), str(tmp_path / "b.bz2")]
+    fake_endpoints.write_reddit_dump(paths[0], copies=3)
+    fake_endpoints.write_reddit_dump(paths[1])
+    entries = reddit_dumps.ingest(paths, queries, workers=2)
+
+    assert [entry["query"] for entry in entries] == [query["text"] for query in queries]
+    found = {entry["query"]: entry["results"] for entry in entries if entry["results"]}
+    assert sorted(found) == ["100ms", "10Times", "Atul Todi", "Jeremiah Anderson",
+                             "Kshitij Gupta", "SmartRent"]
+    # Same record shape as reddit_scraping.py, highest score first; the second dump
+    # repeats the first copy's URLs, which are counted once.
+    assert set(found["100ms"][0]) == {"title", "url", "score", "comments"}
+    assert [record["score"] for record in found["100ms"]] == [310] * 3 + [42] * 3
+    # The NFL namesake is dropped; only the post that also names SmartRent counts.
+    assert {record["title"] for record in found["Jeremiah Anderson"]} == {"SmartRent earnings call"}
+
+
+def test_max_results_keeps_the_top_scores(tmp_path, queries):
+    path = str(tmp_path / "dump.gz")
+    fake_endpoints.write_reddit_dump(path, copies=5)
+    entries = reddit_dumps.ingest([path], queries, workers=1, max_results=3)
+    [kshitij] = [entry for entry in entries if entry["query"] == "Kshitij Gupta"]
+    assert len(kshitij["results"]) == 3
+
+
+def test_founder_needs_a_company_mention(queries):
+    matcher = reddit_dumps.NameMatcher(queries)
+    assert matcher.match("Jeremiah Anderson with the pick-six") == set()
+    assert matcher.match("Jeremiah Anderson, CEO of SmartRent") == {"jeremiah anderson", "smartrent"}
+    # Company names too short for the automaton still count for their founders.
+    assert matcher.match("Reggie Ba-Pe III on building R3") == {"reggie ba-pe iii"}
+    assert matcher.match("Reggie Ba-Pe III scores again") == set()
+
+
+def test_unreadable_lines_are_counted_not_fatal(tmp_path, queries, capsys):
+    path = tmp_path / "dump.ndjson"
+    path.write_text('{"title": "100ms is hiring"}\n{not json\n', encoding="utf-8")
+    entries = reddit_dumps.ingest([str(path)], queries, workers=1)
+    assert [entry["results"] for entry in entries if entry["query"] == "100ms"] == [
+        [{"title": "100ms is hiring", "url": None, "score": 0, "comments": 0}]]
+    assert "1 unreadable lines" in capsys.readouterr().out
@@ -0,0 +1,29 @@
+import scrape
+from entity_matcher import EntityMatcher, get_matcher
+
+
+def test_relevance_scans_each_article_once(monkeypatch):
+    matcher = get_matcher()
+    calls = []
+    find = matcher.find
+    monkeypatch.setattr(matcher, "find", lambda text: calls.append(text) or find(text))
+    article = {"title": "100ms raises $20M Series B", "excerpt": "Live video SDK."}
+    assert scrape.is_relevant(article, "100ms")
+    assert not scrape.is_relevant(article, "10Times")
+    assert article["entities"] == ["100ms"]
+    assert len(calls) == 1
+
+
+def test_queries_outside_the_manifest_match_as_words():
+    article = {"title": "Acme Widgets opens in Pune", "excerpt": ""}
+    assert "Acme Widgets" not in get_matcher()
+    assert scrape.is_relevant(article, "Acme Widgets")
+    assert not scrape.is_relevant(article, "Acme Widget")
+
+
+def test_article_entities_are_kept():
+    matcher = EntityMatcher([{"key": "100ms", "text": "100ms"}])
+    article = {"title": "100ms raises", "excerpt": ""}
+    assert matcher.article_entities(article) == ["100ms"]
+    article["title"] = "Something else"
+    assert matcher.article_entities(article) == ["100ms"]
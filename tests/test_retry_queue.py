@@ -0,0 +1,37 @@
+import asyncio
+
+import retry_queue
+from retry_queue import RetryQueue, TransientError, collector, run_all
+
+
+def test_run_all_without_retries_reports_each_outcome():
+    async def attempt(item):
+        if item == "bad":
+            raise ValueError(item)
+        return item.upper()
+
+    results, collect = collector()
+    asyncio.run(run_all(["a", "bad", "b"], attempt, collect))
+    assert results == {"a": "A", "b": "B"}
+
+
+def test_run_all_retries_transient_failures(monkeypatch, tmp_path):
+    monkeypatch.setattr(retry_queue, "backoff_delay", lambda attempt: 0)
+    tries = {}
+
+    async def attempt(item):
+        tries[item] = tries.get(item, 0) + 1
+        if item == "flaky" and tries[item] < 3:
+            raise TransientError("blocked")
+        if item == "broken":
+            raise ValueError("permanent")
+        return tries[item]
+
+    outcomes = []
+    retries = RetryQueue(str(tmp_path / "dead_letter.jsonl"))
+    results, collect = collector(lambda item, result, error: outcomes.append((item, error)))
+    asyncio.run(run_all(["flaky", "broken"], attempt, collect, retries))
+    assert results == {"flaky": 3}
+    assert tries == {"flaky": 3, "broken": 1}
+    assert [item for item, error in outcomes if error is not None] == ["broken"]
+    assert retries.stats == {"retried": 2, "dead": 1}
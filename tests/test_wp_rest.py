@@ -0,0 +1,98 @@
+import asyncio
+
+import pytest
+
+import factor_daily
+import scrape
+import wp_rest
+from async_fetch import AsyncFetcher
+
+
+@pytest.fixture
+def sites(fake_server, monkeypatch):
+    """Point every WordPress site at the fake endpoints and forget unavailable APIs."""
+    for site in ("techcrunch", "factordaily", "locked", "blocked", "gone", "html", "missing", "strict"):
+        monkeypatch.setitem(wp_rest.SITES, site, f"{fake_server}/{site}")
+    monkeypatch.setattr(wp_rest, "_unavailable", set())
+
+
+def search_async(site, query, page=1, missing="N/A"):
+    async def search():
+        async with AsyncFetcher(cache=False) as fetcher:
+            return await wp_rest.search_posts_async(fetcher, site, query, page, missing)
+    return asyncio.run(search())
+
+
+def test_post_maps_to_record(sites):
+    records = wp_rest.search_posts("techcrunch", "100ms")
+    assert records == [{
+        "title": "100ms raises $20M Series B for its live video SDK",
+        "link": "https://techcrunch.com/2022/01/11/100ms-series-b/",
+        "date": "2022-01-11T05:30:00",
+        "category": "Startups",
+        "author": "Manish Singh",
+        "image": "N/A",
+        "excerpt": "Founded by Kshitij Gupta and Aniket Behera, 100ms’s SDK powers live video.",
+    }]
+
+
+def test_missing_fields_use_the_callers_placeholder(sites):
+    [record] = wp_rest.search_posts("factordaily", "100ms", missing=None)
+    assert record["image"] is None
+    assert record["author"] == "FactorDaily Staff"
+
+
+def test_page_past_the_last_is_empty(sites):
+    assert wp_rest.search_posts("techcrunch", "100ms", page=2) == []
+    assert search_async("techcrunch", "100ms", page=2) == []
+    assert wp_rest.page_size("techcrunch") == wp_rest.PER_PAGE
+
+
+@pytest.mark.parametrize("site", ["locked", "blocked", "gone", "missing", "html", "strict"])
+def test_unusable_api_raises_and_is_remembered(sites, site):
+    with pytest.raises(wp_rest.ApiUnavailable):
+        wp_rest.search_posts(site, "100ms")
+    assert wp_rest.page_size(site) is None
+    with pytest.raises(wp_rest.ApiUnavailable):
+        wp_rest.search_posts(site, "100ms")
+
+
+@pytest.mark.parametrize("site", ["blocked", "html", "strict"])
+def test_unusable_api_raises_async(sites, site):
+    with pytest.raises(wp_rest.ApiUnavailable):
+        search_async(site, "100ms")
+    assert wp_rest.page_size(site) is None
+
+
+def test_async_search_matches_sync(sites):
+    assert search_async("techcrunch", "10Times") == wp_rest.search_posts("techcrunch", "10Times")
+
+
+class FakeResponse:
+    status_code = 200
+    text = "<html><body><ul class='wp-block-post-template'></ul></body></html>"
+
+    def raise_for_status(self):
+        pass
+
+
+@pytest.mark.parametrize("module, scrape_page, site", [
+    (scrape, scrape.scrape_techcrunch, "techcrunch"),
+    (factor_daily, factor_daily.scrape_factordaily, "factordaily"),
+])
+def test_scrapers_fall_back_to_html_search(sites, fake_server, monkeypatch, module, scrape_page, site):
+    monkeypatch.setitem(wp_rest.SITES, site, f"{fake_server}/blocked")
+    get = module.http_client.get
+    requested = []
+
+    def html_get(url, **kwargs):
+        # The REST call goes to the fake endpoints; the live HTML page is stubbed.
+        if url.startswith(fake_server):
+            return get(url, **kwargs)
+        requested.append(url)
+        return FakeResponse()
+
+    monkeypatch.setattr(module.http_client, "get", html_get)
+    assert scrape_page("100ms") == []
+    assert requested == [f"https://{site}.com/?s=100ms"]
+    assert wp_rest.page_size(site) is None
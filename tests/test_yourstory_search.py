@@ -0,0 +1,56 @@
+from urllib.parse import parse_qs, urlparse
+
+import requests
+
+import fake_endpoints
+import yourstory_search
+from retry_queue import RetryQueue, is_transient
+
+
+def test_search_page_skips_seo_and_navigation_objects(fake_server, monkeypatch):
+    monkeypatch.setattr(yourstory_search, "BASE_URL", fake_server)
+    html = requests.get(yourstory_search.search_url("100ms")).text
+    records = yourstory_search.parse_search_page(html)
+    assert [record["title"] for record in records] == [
+        "100ms raises $20M to make live video easy for developers"]
+    assert records[0]["link"] == f"{fake_server}/2023/08/100ms-raises-20m-live-video"
+    assert records[0]["date"] == "2023-08-25T10:00:00Z"
+    assert records[0]["category"] == "Funding"
+
+
+def test_search_page_without_results_has_no_records(fake_server, monkeypatch):
+    monkeypatch.setattr(yourstory_search, "BASE_URL", fake_server)
+    html = requests.get(yourstory_search.search_url("no such startup")).text
+    assert yourstory_search.parse_search_page(html) == []
+
+
+def test_stories_without_a_results_array_need_a_publish_date():
+    data = {"props": {"pageProps": {
+        "seo": {"title": "Search results | YourStory", "url": "https://yourstory.com/search"},
+        "navigation": [{"title": "Funding", "slug": "funding"}],
+        "featured": {"title": "10Times pivots", "path": "/2022/05/10times",
+                     "publishedAt": "2022-05-02T06:00:00Z"},
+    }}}
+    assert [story["title"] for story in yourstory_search.find_stories(data)] == ["10Times pivots"]
+
+
+def test_search_url_escapes_the_query():
+    query = "Vikas Kamra (We are hiring for #datascience & analytics)"
+    url = urlparse(yourstory_search.search_url(query, page=2))
+    assert parse_qs(url.query) == {"q": [query], "page": ["2"]}
+    assert not url.fragment
+
+
+def test_challenge_page_fails_the_query_as_transient(fake_server, monkeypatch, tmp_path):
+    monkeypatch.setattr(yourstory_search, "BASE_URL", fake_server)
+    retries = RetryQueue(str(tmp_path / "dead_letter.jsonl"), max_attempts=1)
+    outcomes = []
+    results = yourstory_search.search_many(
+        [fake_endpoints.YOURSTORY_CHALLENGE_QUERY],
+        on_result=lambda query, records, error: outcomes.append((query, records, error)),
+        retries=retries)
+    assert results == {}
+    [(query, records, error)] = outcomes
+    assert records is None
+    assert is_transient(error)
+    assert retries.stats["dead"] == 1
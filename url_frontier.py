@@ -0,0 +1,147 @@
+import asyncio
+import hashlib
+import math
+import os
+import sqlite3
+import threading
+import time
+
+from http_cache import normalize_url
+
+FRONTIER_PATH = "url_frontier.sqlite"
+# Bump (or set SCRAPER_CRAWL_GENERATION) to refetch every article once more;
+# excerpts stored under older generations are then ignored.
+DEFAULT_GENERATION = 1
+BLOOM_CAPACITY = 1_000_000
+BLOOM_ERROR_RATE = 0.001
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings. False positives are possible at roughly
+    error_rate once capacity items are added; false negatives are not.
+    """
+
+    def __init__(self, capacity=BLOOM_CAPACITY, error_rate=BLOOM_ERROR_RATE):
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, item):
+        # Double hashing: k positions derived from two 64-bit halves of one digest.
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, item):
+        for pos in self._positions(item):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, item):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+class UrlFrontier:
+    """
+    Records every article URL fetched in the current crawl generation together with
+    its excerpt, across queries, sources and restarts. A Bloom filter of seen URLs
+    answers "never fetched" without touching the store.
+    """
+
+    def __init__(self, path=FRONTIER_PATH, generation=DEFAULT_GENERATION):
+        self.path = path
+        self.generation = generation
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS excerpts ("
+            " key TEXT PRIMARY KEY, url TEXT, excerpt TEXT, source TEXT,"
+            " generation INTEGER, fetched_at REAL)"
+        )
+        self._conn.commit()
+        self._seen = BloomFilter()
+        for (key,) in self._conn.execute("SELECT key FROM excerpts WHERE generation = ?",
+                                         (generation,)):
+            self._seen.add(key)
+        self._in_flight = {}
+        self.stats = {"reused": 0, "fetched": 0}
+
+    def get_excerpt(self, url):
+        """
+        Return the stored excerpt for a URL in this generation, or None.
+        """
+        key = normalize_url(url)
+        if key not in self._seen:
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT excerpt FROM excerpts WHERE key = ? AND generation = ?",
+                (key, self.generation)).fetchone()
+        return row[0] if row else None
+
+    def record(self, url, excerpt, source):
+        """
+        Store the excerpt fetched for a URL.
+        """
+        key = normalize_url(url)
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO excerpts VALUES (?, ?, ?, ?, ?, ?)",
+                               (key, url, excerpt, source, self.generation, time.time()))
+            self._conn.commit()
+            self._seen.add(key)
+
+    def memoize(self, url, fetch, source):
+        """
+        Return the stored excerpt for url, or call fetch() once and store its result.
+        Exceptions from fetch propagate and nothing is stored, so failures are retried.
+        """
+        excerpt = self.get_excerpt(url)
+        if excerpt is not None:
+            self.stats["reused"] += 1
+            return excerpt
+        excerpt = fetch()
+        self.record(url, excerpt, source)
+        self.stats["fetched"] += 1
+        return excerpt
+
+    async def memoize_async(self, url, fetch, source):
+        """
+        Async memoize: fetch is a coroutine function. Concurrent callers asking for
+        the same URL share a single fetch.
+        """
+        excerpt = self.get_excerpt(url)
+        if excerpt is not None:
+            self.stats["reused"] += 1
+            return excerpt
+        key = normalize_url(url)
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fetch())
+            self._in_flight[key] = task
+            try:
+                excerpt = await task
+            finally:
+                del self._in_flight[key]
+            self.record(url, excerpt, source)
+            self.stats["fetched"] += 1
+            return excerpt
+        self.stats["reused"] += 1
+        return await task
+
+    def report(self):
+        """
+        Print how many excerpts were fetched versus reused in this run.
+        """
+        print(f"URL frontier (generation {self.generation}): {self.stats['fetched']} articles fetched, "
+              f"{self.stats['reused']} reused")
+
+_frontier = None
+
+def get_frontier():
+    """
+    Return the process-wide frontier, creating it on first use.
+    """
+    global _frontier
+    if _frontier is None:
+        generation = int(os.environ.get("SCRAPER_CRAWL_GENERATION", DEFAULT_GENERATION))
+        _frontier = UrlFrontier(generation=generation)
+    return _frontier
@@ -0,0 +1,111 @@
+import json
+import os
+from urllib.parse import quote_plus
+
+import http_client
+from html_parsing import html_to_text
+
+# TechCrunch and FactorDaily both run WordPress, whose REST API returns a page of
+# search results with title, link, date, excerpt, categories, authors and image in
+# one JSON response. The base URLs can be pointed elsewhere (e.g. fake_endpoints).
+SITES = {
+    "techcrunch": os.environ.get("TECHCRUNCH_WP_BASE", "https://techcrunch.com"),
+    "factordaily": os.environ.get("FACTORDAILY_WP_BASE", "https://factordaily.com"),
+}
+PER_PAGE = 20
+# Only these fields are returned; _links must be kept for _embed to work with _fields.
+FIELDS = "date,link,title,excerpt,_links,_embedded"
+EMBED = "author,wp:term,wp:featuredmedia"
+# Statuses meaning the API is switched off or blocked for us, not just a bad query.
+UNAVAILABLE_STATUSES = (401, 403, 404, 410, 501)
+
+# Sites whose API turned out to be unavailable in this run; they go straight to HTML.
+_unavailable = set()
+
+class ApiUnavailable(Exception):
+    """The site's REST API can't be used; the caller should parse the HTML pages."""
+
+def page_size(site):
+    """Results per page from site's API, or None once it is known to be unavailable."""
+    return None if site in _unavailable else PER_PAGE
+
+def posts_url(site, query, page=1, per_page=PER_PAGE):
+    return (f"{SITES[site]}/wp-json/wp/v2/posts?search={quote_plus(query)}&page={page}"
+            f"&per_page={per_page}&_embed={EMBED}&_fields={FIELDS}")
+
+def post_to_record(post, missing="N/A"):
+    """
+    Map a REST post to the scrapers' record: title, link, date, category (the first
+    one), author (all, comma separated), image and excerpt. missing fills absent fields.
+    """
+    embedded = post.get("_embedded", {})
+    authors = [author.get("name") for author in embedded.get("author", []) if author.get("name")]
+    # wp:term holds one list of terms per taxonomy; categories come first.
+    categories = [term.get("name") for terms in embedded.get("wp:term", []) for term in terms
+                  if term.get("taxonomy") == "category" and term.get("name")]
+    media = embedded.get("wp:featuredmedia") or [{}]
+    return {
+        "title": html_to_text(post.get("title", {}).get("rendered")) or missing,
+        "link": post.get("link") or missing,
+        "date": post.get("date") or missing,
+        "category": html_to_text(categories[0]) if categories else missing,
+        "author": ", ".join(authors) or missing,
+        "image": media[0].get("source_url") or missing,
+        "excerpt": html_to_text(post.get("excerpt", {}).get("rendered")),
+    }
+
+def parse_posts(site, text, missing="N/A"):
+    """
+    Records from a posts response body. Raises ApiUnavailable (and stops using the
+    API for site) when the body is not a JSON list of posts.
+    """
+    try:
+        posts = json.loads(text)
+    except ValueError:
+        posts = None
+    if not isinstance(posts, list):
+        _unavailable.add(site)
+        raise ApiUnavailable(f"{site} REST API returned no post list")
+    return [post_to_record(post, missing) for post in posts]
+
+def _check_status(site, status, page):
+    # Returns True when the page is past the last one (WordPress answers 400). On
+    # the first page a 400 is a rejected parameter (rest_invalid_param), so the API
+    # can't be used as called.
+    if status in UNAVAILABLE_STATUSES or status == 400 and page == 1:
+        _unavailable.add(site)
+        raise ApiUnavailable(f"{site} REST API unavailable (HTTP {status})")
+    return status == 400
+
+def search_posts(site, query, page=1, missing="N/A"):
+    """
+    One page of search results for query from site's REST API, as records.
+    Raises ApiUnavailable when the HTML pages have to be used instead.
+    """
+    if site in _unavailable:
+        raise ApiUnavailable(f"{site} REST API unavailable")
+    url = posts_url(site, query, page)
+    print(f"Querying REST API: {url}")
+    response = http_client.get(url, headers={"Accept": "application/json"})
+    if response.status_code != 200:
+        if _check_status(site, response.status_code, page):
+            return []
+        response.raise_for_status()
+    return parse_posts(site, response.text, missing)
+
+async def search_posts_async(fetcher, site, query, page=1, missing="N/A"):
+    """
+    Async counterpart of search_posts using an AsyncFetcher.
+    """
+    if site in _unavailable:
+        raise ApiUnavailable(f"{site} REST API unavailable")
+    url = posts_url(site, query, page)
+    print(f"Querying REST API: {url}")
+    try:
+        text = await fetcher.fetch_text(url)
+    except Exception as e:
+        status = getattr(e, "status", None)
+        if status is not None and _check_status(site, status, page):
+            return []
+        raise
+    return parse_posts(site, text, missing)
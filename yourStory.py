@@ -1,171 +1,262 @@
 import undetected_chromedriver as uc
 import time
-import pickle
-import os
-import json
-import random
-import ast
-from selenium.webdriver.common.keys import Keys
+import sys
 
-from selenium.webdriver.common.by import By
-from bs4 import BeautifulSoup
+import browser_daemon
+import browser_extract
+import browser_waits
+import lean_browser
+import pagination
+import rate_limit
+import yourstory_search
+from browser_pool import BrowserPool, DEFAULT_POOL_SIZE
+from browser_waits import wait_for, wait_until_ready, any_present, scroll_until_exhausted
+from checkpoint_log import CheckpointLog
+from html_parsing import make_soup, YOURSTORY_RESULTS
+from hybrid_session import HybridFetcher
+from query_manifest import manifest_queries
+from retry_queue import RetryQueue, take_dead_letters
+from session_store import ensure_session, SITES
+from url_frontier import get_frontier
+from yourstory_search import parse_article_excerpt
 
-cookies_file = "cookies.pkl"
+# Login cookies live in the per-site session store (sessions/yourstory.pkl).
+SITE = "yourstory"
+RESULTS_SELECTOR = "section.container-results"
+RESULT_ITEM_SELECTOR = "section.container-results li.sc-c9f6afaa-0"
+# Number of headless browsers scraping in parallel.
+BROWSER_POOL_SIZE = DEFAULT_POOL_SIZE
+# Block images, media, fonts and trackers in the headless browsers.
+LEAN_MODE = True
+# Pull result fields out with in-page scripts instead of parsing page_source.
+EXTRACT_IN_BROWSER = True
+# Fetch article excerpts over plain HTTP with the browser's cookies; the browser
+# only loads search pages.
+HYBRID_EXCERPTS = True
+# Read search results from the pages' embedded hydration JSON over plain HTTP
+# instead of using browsers. Up to SEARCH_PAGES result pages are read per query.
+HYDRATION_JSON = True
+SEARCH_PAGES = yourstory_search.DEFAULT_PAGES
 
-def login_and_save_cookies():
+def login():
+    """Open a visible browser for a manual login and return its cookies."""
     options = uc.ChromeOptions()
     driver = uc.Chrome(options=options)
-    driver.get("https://yourstory.com/login")
+    driver.get(SITES[SITE]["login_url"])
     print("Please log in manually within the next 40 seconds...")
     time.sleep(40)
-    with open(cookies_file, "wb") as f:
-        pickle.dump(driver.get_cookies(), f)
-    print("Cookies saved successfully!")
+    cookies = driver.get_cookies()
     driver.quit()
+    return cookies
 
-if not os.path.exists(cookies_file):
-    login_and_save_cookies()
-
-def create_driver(headless=True):
+def create_driver(cookies, headless=True, lean=LEAN_MODE):
     options = uc.ChromeOptions()
     if headless:
         options.add_argument("--headless")
         options.add_argument("--disable-gpu")
     options.add_argument("--no-sandbox")
     options.add_argument("--disable-dev-shm-usage")
+    if lean:
+        lean_browser.configure_options(options)
     driver = uc.Chrome(options=options)
+    if lean:
+        lean_browser.enable_lean_mode(driver)
     driver.get("https://yourstory.com")
-    time.sleep(5)
-    with open(cookies_file, "rb") as f:
-        cookies = pickle.load(f)
-        for cookie in cookies:
-            if "sameSite" in cookie:
-                cookie.pop("sameSite")
-            driver.add_cookie(cookie)
-    driver.refresh()
-    time.sleep(5)
+    wait_until_ready(driver, "homepage load")
+    add_login_cookies(driver, cookies)
     return driver
 
+def add_login_cookies(driver, cookies):
+    """
+    Load the stored login into a driver that is on the home page, then reload it.
+    Also used by browser_daemon.
+    """
+    for cookie in cookies:
+        cookie = {key: value for key, value in cookie.items() if key != "sameSite"}
+        driver.add_cookie(cookie)
+    driver.refresh()
+    wait_until_ready(driver, "homepage reload")
+
+def driver_factory():
+    """
+    Attach to tabs of a running browser daemon (python browser_daemon.py yourstory) when
+    there is one; otherwise launch browsers here with the stored login, which only
+    asks for a manual login when it no longer works.
+    """
+    if browser_daemon.running(SITE):
+        print("Attaching to the running browser daemon")
+        return lambda: browser_daemon.attach(SITE, lean=LEAN_MODE)
+    cookies = ensure_session(SITE, login)
+    return lambda: create_driver(cookies, headless=True)
+
 def get_excerpt(driver, link):
-    """Given an article URL, visit the page and return the excerpt text."""
+    """Given an article URL, visit the page and return the excerpt text (memoized in the URL frontier)."""
     try:
-        driver.get(link)
-        time.sleep(random.uniform(2, 3))
-        soup_article = BeautifulSoup(driver.page_source, "html.parser")
-        meta_desc = soup_article.find("meta", attrs={"name": "description"})
-        if meta_desc and meta_desc.get("content"):
-            return meta_desc["content"].strip()
-        article_tag = soup_article.find("article")
-        if article_tag:
-            p_tag = article_tag.find("p")
-            if p_tag:
-                return p_tag.get_text(strip=True)
-        return ""
+        return get_frontier().memoize(link, lambda: _read_excerpt(driver, link), source="yourstory")
     except Exception as e:
         print(f"Error scraping excerpt from {link}: {e}")
         return ""
 
+def _read_excerpt(driver, link):
+    rate_limit.browser_get(driver, link)
+    wait_for(driver, any_present('meta[name="description"]', "article p"), "article excerpt")
+    lean_browser.record_page(driver, link)
+    if EXTRACT_IN_BROWSER:
+        return browser_extract.excerpt(driver, "article")
+    return parse_article_excerpt(driver.page_source)
+
+def hybrid_fetcher(driver):
+    """HTTP fetcher sharing this driver's login cookies, created once per driver."""
+    if getattr(driver, "hybrid_fetcher", None) is None:
+        driver.hybrid_fetcher = HybridFetcher.from_driver(driver)
+    return driver.hybrid_fetcher
+
+def parse_yourstory_items(html):
+    """
+    Parse search results HTML into [{title, link, date, category}], or None when the
+    results container is missing.
+    """
+    soup = make_soup(html, YOURSTORY_RESULTS)
+    container = soup.find("section", class_="container-results")
+    if not container:
+        return None
+
+    items = []
+    for item in container.select("li.sc-c9f6afaa-0"):
+        a_tags = item.find_all("a", href=True)
+        title = None
+        link = None
+        for a in a_tags:
+            span = a.find("span")
+            if span:
+                text = span.get_text(strip=True)
+                if text:
+                    title = text
+                    link = a["href"]
+                    break
+
+        date_tag = item.find("span", class_="sc-36431a7-0 dpmmXH")
+        date = date_tag.get_text(strip=True) if date_tag else None
+
+        cat_container = item.select_one("div.sc-c9f6afaa-10.jqCVBY span")
+        category = cat_container.get_text(strip=True) if cat_container else None
+        items.append({"title": title, "link": link, "date": date, "category": category})
+    return items
+
 def scrape_yourstory(driver, query, page=1):
+    """
+    Entries on one result page. Raises when the page can't be loaded or read, so
+    the query is logged as failed and retried instead of finishing with no results.
+    """
     results = []
     search_url = f"https://yourstory.com/search?q={query}&page={page}"
     print(f"\nScraping URL: {search_url}")
     try:
-        driver.get(search_url)
-        time.sleep(random.uniform(5, 8))
-        # Scroll down to load dynamic content
-        for _ in range(3):
-            driver.find_element(By.TAG_NAME, "body").send_keys(Keys.PAGE_DOWN)
-            time.sleep(random.uniform(2, 4))
-        soup = BeautifulSoup(driver.page_source, "html.parser")
-        container = soup.find("section", class_="container-results")
-        if not container:
+        rate_limit.browser_get(driver, search_url)
+        # Wait for the results, then scroll until no more items load.
+        if wait_for(driver, any_present(RESULTS_SELECTOR), "search results"):
+            scroll_until_exhausted(driver, RESULT_ITEM_SELECTOR, "search results scroll")
+        lean_browser.record_page(driver, search_url)
+        if EXTRACT_IN_BROWSER:
+            article_items = browser_extract.yourstory_results(driver)
+        else:
+            article_items = parse_yourstory_items(driver.page_source)
+        if article_items is None:
             print("No container-results found on the page.")
             return results
-
-        article_items = container.select("li.sc-c9f6afaa-0")
         if not article_items:
             print("No article items found in container.")
             return results
 
         for item in article_items:
-            a_tags = item.find_all("a", href=True)
-            title = None
-            link = None
-            for a in a_tags:
-                span = a.find("span")
-                if span:
-                    text = span.get_text(strip=True)
-                    if text:
-                        title = text
-                        link = a["href"]
-                        break
-
+            title = item["title"]
+            link = item["link"]
             if link and link.startswith("/"):
                 link = "https://yourstory.com" + link
 
-            date_tag = item.find("span", class_="sc-36431a7-0 dpmmXH")
-            date = date_tag.get_text(strip=True) if date_tag else None
-
-            cat_container = item.select_one("div.sc-c9f6afaa-10.jqCVBY span")
-            category = cat_container.get_text(strip=True) if cat_container else None
-
-            excerpt = get_excerpt(driver, link) if link else ""
+            excerpt = ""
+            if link and not HYBRID_EXCERPTS:
+                excerpt = get_excerpt(driver, link)
             results.append({
                 "title": title,
                 "link": link,
-                "date": date,
-                "category": category,
+                "date": item["date"],
+                "category": item["category"],
                 "excerpt": excerpt
             })
             print(f"Scraped entry - Title: {title}")
+
+        if HYBRID_EXCERPTS:
+            links = [entry["link"] for entry in results if entry["link"]]
+            excerpts = hybrid_fetcher(driver).fetch_excerpts(links, parse_article_excerpt, "yourstory")
+            for entry in results:
+                if entry["link"]:
+                    entry["excerpt"] = excerpts.get(entry["link"], "")
     except Exception as e:
         print(f"Error scraping page {page} for query '{query}': {e}")
+        raise
     return results
 
-def save_results(all_results, filename="yourstory_funders_companies_results.json"):
-    with open(filename, "w", encoding="utf-8") as f:
-        json.dump(all_results, f, indent=4)
-    print("File saved to", filename)
-
-def main():
-    # Load companies and founders data from JSON
-    with open("founders_companies.json", "r", encoding="utf-8") as f:
-        companies_data = json.load(f)
-
-    # Build a set of unique queries from company names and founder names.
-    queries = set()
-    for record in companies_data:
-        if "Company" in record and record["Company"]:
-            queries.add(record["Company"])
-        if "Founders" in record and record["Founders"]:
-            try:
-                founders_list = ast.literal_eval(record["Founders"])
-                for founder in founders_list:
-                    queries.add(founder)
-            except Exception as e:
-                print(f"Error parsing founders for {record.get('Company', 'Unknown')}: {e}")
-
-    print(f"Total unique queries to scrape: {len(queries)}")
-    driver = create_driver(headless=True)
-    all_results = {}
+# One line per finished query; compacted into the query -> entries JSON, keeping
+# queries that found nothing.
+checkpoint = CheckpointLog("yourstory_funders_companies_results.jsonl",
+                           "yourstory_funders_companies_results.json", keep_empty=True)
+# Queries whose HTTP search kept failing; rerun just these with --replay.
+retries = RetryQueue("yourstory_dead_letter.jsonl")
+
+def scrape_query(driver, query):
+    """Scrape result pages for one query with the given driver, one page at a time."""
+    print(f"\n--- Scraping results for query: '{query}' ---")
+    entries, _ = pagination.paginate(lambda page: scrape_yourstory(driver, query, page), query,
+                                     max_pages=SEARCH_PAGES, window=1)
+    return entries
+
+def main(fresh=False, replay=False):
+    """
+    Scrape every query not yet completed in the checkpoint log.
+    Pass --fresh on the command line to discard previous progress and start over,
+    or --replay to rerun only the queries in the dead-letter file.
+    """
+    if replay:
+        queries = take_dead_letters(retries.dead_letter_path)
+    else:
+        # Unique, normalized company and founder names from founders_companies.json.
+        queries = manifest_queries()
+        print(f"Total unique queries to scrape: {len(queries)}")
+        queries = checkpoint.resume(queries, fresh=fresh)
+    if not queries:
+        checkpoint.compact()
+        print("Nothing left to scrape.")
+        return
     entry_count = 0
 
-    # Loop over each query and scrape data.
-    for query in queries:
-        print(f"\n--- Scraping results for query: '{query}' ---")
-        all_results[query] = []  # initialize results for this query
-        for page in range(1, 2):  # You can increase the page range if needed.
-            data = scrape_yourstory(driver, query, page)
-            for entry in data:
-                all_results[query].append(entry)
-                entry_count += 1
-                print(f"Total entries scraped so far: {entry_count}")
-                if entry_count % 2 == 0:
-                    save_results(all_results)
+    def handle_result(query, entries, error):
+        nonlocal entry_count
+        if error is not None:
+            print(f"Error scraping query '{query}': {error}")
+            checkpoint.append(query, [], status="error", error=error)
+            return
+        entry_count += len(entries)
+        print(f"Total entries scraped so far: {entry_count}")
+        checkpoint.append(query, entries, pages=pagination.depths.get(query))
+
+    if HYDRATION_JSON:
+        yourstory_search.search_many(queries, on_result=handle_result, pages=SEARCH_PAGES,
+                                     retries=retries)
+    else:
+        # Each browser in the pool takes queries from a shared queue.
+        with BrowserPool(driver_factory(), size=BROWSER_POOL_SIZE) as pool:
+            pool.run(queries, scrape_query, on_result=handle_result)
     # Final save of results
-    save_results(all_results)
+    checkpoint.compact()
+    checkpoint.close()
     print("\nScraping completed. Total entries scraped:", entry_count)
-    driver.quit()
+    get_frontier().report()
+    browser_waits.report()
+    lean_browser.report()
+    pagination.report()
+    rate_limit.report()
+    retries.report()
 
 if __name__ == "__main__":
-    main()
+    main(fresh="--fresh" in sys.argv, replay="--replay" in sys.argv)
@@ -0,0 +1,193 @@
+import asyncio
+import json
+import os
+from urllib.parse import quote_plus
+
+from async_fetch import AsyncFetcher, DEFAULT_CONCURRENCY, DEFAULT_PER_HOST
+from head_excerpt import stream_excerpt_async
+from pagination import paginate_async
+from retry_queue import TransientError, collector, is_transient, run_all
+from html_parsing import extract_excerpt, html_to_text
+from session_store import load_cookies
+from url_frontier import get_frontier
+
+# YourStory is a Next.js site: the search page ships its results as the hydration
+# payload in <script id="__NEXT_DATA__">, so plain HTTP is enough and no browser or
+# scrolling is needed. YOURSTORY_BASE_URL points it elsewhere (e.g. fake_endpoints).
+BASE_URL = os.environ.get("YOURSTORY_BASE_URL", "https://yourstory.com")
+NEXT_DATA_MARKER = '<script id="__NEXT_DATA__" type="application/json">'
+# Deepest result page read per query (see pagination).
+DEFAULT_PAGES = 3
+
+# Keys under pageProps that hold the search results array, in order of preference.
+RESULT_KEYS = ("stories", "results", "searchResults", "articles", "items", "hits")
+# Keys the story objects in the payload use for each record field, in order of preference.
+LINK_KEYS = ("path", "url", "link", "slug")
+DATE_KEYS = ("publishedAt", "publishedTime", "date", "createdAt")
+CATEGORY_KEYS = ("category", "section", "vertical")
+EXCERPT_KEYS = ("excerpt", "subtitle", "description", "summary")
+
+def search_url(query, page=1):
+    return f"{BASE_URL}/search?q={quote_plus(query)}&page={page}"
+
+def next_data(html):
+    """The parsed __NEXT_DATA__ payload of a page, or None if it has none."""
+    start = html.find(NEXT_DATA_MARKER)
+    if start == -1:
+        return None
+    start += len(NEXT_DATA_MARKER)
+    end = html.find("</script>", start)
+    try:
+        return json.loads(html[start:end])
+    except ValueError:
+        return None
+
+def _first(story, keys):
+    for key in keys:
+        value = story.get(key)
+        if isinstance(value, dict):
+            value = value.get("name") or value.get("title")
+        elif isinstance(value, list):
+            value = value[0] if value and isinstance(value[0], str) else None
+        if value:
+            return value
+    return None
+
+def _is_story(value):
+    # SEO blocks and navigation entries also carry a title and a link; only stories
+    # have a publish date as well.
+    return (isinstance(value, dict) and isinstance(value.get("title"), str)
+            and any(isinstance(value.get(key), str) for key in LINK_KEYS)
+            and any(value.get(key) for key in DATE_KEYS))
+
+def _results_array(value):
+    # The first list under a RESULT_KEYS key, searching nested dicts breadth first.
+    pending = [value]
+    while pending:
+        value = pending.pop(0)
+        if not isinstance(value, dict):
+            continue
+        for key in RESULT_KEYS:
+            if isinstance(value.get(key), list):
+                return value[key]
+        pending.extend(value.values())
+    return None
+
+def find_stories(data):
+    """
+    Story objects in a payload: the entries of the results array under
+    props.pageProps (see RESULT_KEYS) that have a title, a link and a publish
+    date. Without a known results array, such objects are collected from anywhere
+    under pageProps, in document order.
+    """
+    page_props = data.get("props", {}).get("pageProps", data)
+    results = _results_array(page_props)
+    if results is not None:
+        return [story for story in results if _is_story(story)]
+    stories = []
+    stack = [page_props]
+    while stack:
+        value = stack.pop()
+        if _is_story(value):
+            stories.append(value)
+        elif isinstance(value, dict):
+            stack.extend(reversed(list(value.values())))
+        elif isinstance(value, list):
+            stack.extend(reversed(value))
+    return stories
+
+def story_to_record(story):
+    """Map a payload story to the {title, link, date, category, excerpt} record."""
+    link = _first(story, LINK_KEYS)
+    if link.startswith("/"):
+        link = BASE_URL + link
+    elif not link.startswith("http"):
+        link = f"{BASE_URL}/{link}"
+    return {
+        "title": story["title"],
+        "link": link,
+        "date": _first(story, DATE_KEYS),
+        "category": _first(story, CATEGORY_KEYS),
+        "excerpt": html_to_text(_first(story, EXCERPT_KEYS)),
+    }
+
+def parse_search_page(html):
+    """
+    Records from a search page's hydration payload, or None when the page has
+    no payload (e.g. a block page).
+    """
+    data = next_data(html)
+    if data is None:
+        return None
+    return [story_to_record(story) for story in find_stories(data)]
+
+def parse_article_excerpt(html):
+    """Excerpt from article HTML: the meta description, else the first <article> paragraph."""
+    return extract_excerpt(html, "article")
+
+async def fetch_article_excerpt(fetcher, link):
+    """Excerpt for a story whose payload had none (memoized in the URL frontier)."""
+    try:
+        return await get_frontier().memoize_async(
+            link, lambda: stream_excerpt_async(fetcher, link, parse_article_excerpt),
+            source="yourstory")
+    except Exception as e:
+        if is_transient(e):
+            raise
+        print(f"Error fetching excerpt from {link}: {e}")
+        return ""
+
+async def search_query(fetcher, query, pages=DEFAULT_PAGES):
+    """
+    Read up to pages result pages for a query (pages after the first fetched
+    concurrently, stopping once they run dry) and return the records,
+    de-duplicated by link. Missing excerpts are read from the article pages.
+    A page without a hydration payload (a block or challenge page) raises
+    TransientError, so the query is retried rather than finishing empty.
+    """
+    async def fetch_page(page):
+        records = parse_search_page(await fetcher.fetch_text(search_url(query, page)))
+        if records is None:
+            raise TransientError(f"No hydration payload on page {page} for query '{query}'")
+        return records
+
+    records, _ = await paginate_async(fetch_page, query, max_pages=pages)
+
+    missing = [record for record in records if not record["excerpt"]]
+    excerpts = await asyncio.gather(*(fetch_article_excerpt(fetcher, record["link"])
+                                      for record in missing))
+    for record, excerpt in zip(missing, excerpts):
+        record["excerpt"] = excerpt
+    return records
+
+def _cookie_header():
+    # Send the stored login, if any, the way the browser would; never prompts.
+    cookies = load_cookies("yourstory") or []
+    if not cookies:
+        return {}
+    return {"Cookie": "; ".join(f"{cookie['name']}={cookie['value']}" for cookie in cookies)}
+
+async def _search_all(queries, on_result, pages, concurrency, per_host, retries):
+    async with AsyncFetcher(concurrency=concurrency, per_host=per_host,
+                            headers=_cookie_header()) as fetcher:
+        query_slots = asyncio.Semaphore(max(1, concurrency // pages))
+
+        async def attempt(query):
+            async with query_slots:
+                return await search_query(fetcher, query, pages)
+
+        await run_all(queries, attempt, on_result, retries)
+
+def search_many(queries, on_result=None, pages=DEFAULT_PAGES, concurrency=DEFAULT_CONCURRENCY,
+                per_host=DEFAULT_PER_HOST, retries=None):
+    """
+    Search YourStory for many queries over plain HTTP. With a RetryQueue, transient
+    failures are retried with backoff and permanent ones end up in its dead-letter file.
+
+    on_result(query, records, error) is called as each query finishes; error is the
+    exception raised for that query (records is None then). Returns a dict mapping
+    each successful query to its records.
+    """
+    results, collect = collector(on_result)
+    asyncio.run(_search_all(queries, collect, pages, concurrency, per_host, retries))
+    return results